@@ -0,0 +1,68 @@
+"""
+Chunked deletion of user accounts for the task_manager application.
+
+Deleting a User through the ORM makes Django's collector load every related
+task into memory before deleting it. delete_account instead removes the rows
+that belong to the user with plain DELETE statements of at most `chunk_size`
+rows, each in its own transaction, and deletes the user last. Stored
+attachment files are removed from object storage first. An interrupted
+run leaves a consistent, partially deleted account that the next run resumes.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from .attachments import delete_user_objects
+from .models import Task, ArchivedTask, Attachment, Tag, TaskTag
+
+# Models holding rows that belong to a user and the lookup from each model to
+# the user, in the order they are deleted.
+ACCOUNT_DATA_MODELS = [
+    (Attachment, 'task__user'),
+    (TaskTag, 'task__user'),
+    (Task, 'user'),
+    (ArchivedTask, 'user'),
+    (Tag, 'user'),
+]
+
+
+def _delete_chunk(model, lookup, user, chunk_size):
+    """
+    Delete up to `chunk_size` rows of the model that belong to the user.
+    Return the number of deleted rows.
+    """
+    quote = connection.ops.quote_name
+    pks = model.objects.filter(**{lookup: user}).order_by('pk').values('pk')[:chunk_size]
+    sql, params = pks.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({sql})',
+            params,
+        )
+        return cursor.rowcount
+
+
+def delete_account(user, chunk_size=None, progress=None):
+    """
+    Delete a user and all of their data in bounded transactions.
+
+    :param user: User - The account to delete.
+    :param chunk_size: int - Maximum number of rows deleted per transaction (default: ACCOUNT_DELETION_CHUNK_SIZE).
+    :param progress: callable - Called as progress(model, deleted, total) after every chunk.
+    :return: int - The number of deleted rows, not counting the user itself.
+    """
+    chunk_size = chunk_size or settings.ACCOUNT_DELETION_CHUNK_SIZE
+    deleted_rows = 0
+    delete_user_objects(user.pk)
+    for model, lookup in ACCOUNT_DATA_MODELS:
+        total = model.objects.filter(**{lookup: user}).count()
+        deleted = 0
+        while deleted < total:
+            with transaction.atomic():
+                count = _delete_chunk(model, lookup, user, chunk_size)
+            if not count:
+                break
+            deleted += count
+            if progress is not None:
+                progress(model, deleted, total)
+        deleted_rows += deleted
+    user.delete()
+    return deleted_rows
@@ -1,3 +1,61 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.db import transaction
+from .models import SlowQuery
+from .tasks import delete_user_account
 
-# Register your models here.
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """
+    Read-only admin for the slow-query log.
+    """
+    list_display = ['captured_at', 'view_name', 'duration_ms', 'path', 'explained_at']
+    list_filter = ['view_name']
+    search_fields = ['sql', 'path']
+    readonly_fields = [
+        'captured_at', 'view_name', 'path', 'request_params',
+        'duration_ms', 'sql', 'params', 'plan', 'explained_at',
+    ]
+
+    def has_add_permission(self, request):
+        """
+        Slow queries are only captured by the middleware.
+        """
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """
+        Captured queries cannot be edited.
+        """
+        return False
+
+
+class AccountUserAdmin(UserAdmin):
+    """
+    User admin with an action that deletes accounts in bounded chunks.
+    """
+    actions = ['delete_accounts']
+
+    @admin.action(description='Delete selected accounts and their tasks in chunks', permissions=['delete'])
+    def delete_accounts(self, request, queryset):
+        """
+        Deactivate the selected users and queue their deletion for a Celery worker, since
+        deleting large accounts takes longer than a request may run.
+        """
+        user_ids = list(queryset.values_list('pk', flat=True))
+        queryset.update(is_active=False)
+        for user_id in user_ids:
+            transaction.on_commit(lambda user_id=user_id: delete_user_account.delay(user_id))
+        self.message_user(
+            request,
+            f'Deactivated {len(user_ids)} accounts and queued them for deletion. The deletion finishes in the '
+            f'background; only if an account is still listed once the worker has had time to finish, run the '
+            f'action again to resume it.',
+            messages.SUCCESS,
+        )
+
+
+admin.site.unregister(User)
+admin.site.register(User, AccountUserAdmin)
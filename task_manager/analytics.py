@@ -0,0 +1,150 @@
+"""
+Per-user productivity analytics for the task_manager application.
+
+Daily counts of created and completed tasks are aggregated in the database
+and cached per user together with a watermark (the last task id and the last
+completion time seen), so a refresh only aggregates tasks created or completed
+since the previous one. Counts are events: archived tasks keep counting, and a
+task completed twice counts twice. The backlog age distribution depends on
+which tasks are open right now; it is recomputed with vectorized pandas
+operations over the open tasks' creation dates, fetched in chunks, whenever
+the number of open tasks or the counts change, and at least once a day.
+"""
+from itertools import islice
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Task, ArchivedTask
+
+CHUNK_SIZE = 5000
+CACHE_TIMEOUT = 60 * 60 * 24
+BACKLOG_AGE_BINS = [0, 1, 7, 30, 90, 365, np.inf]
+BACKLOG_AGE_LABELS = ['< 1 day', '1-7 days', '7-30 days', '30-90 days', '90-365 days', '> 1 year']
+
+
+def _cache_key(user):
+    """
+    Return the cache key of a user's analytics.
+    """
+    return f'task_analytics:{user.pk}'
+
+
+def _daily_counts(querysets, date_field):
+    """
+    Count the rows of the querysets per day of `date_field`, aggregated in the database.
+    Return a {date: count} dict.
+    """
+    counts = {}
+    for queryset in querysets:
+        rows = queryset.annotate(day=TruncDate(date_field)).values('day').annotate(count=Count('pk')).order_by()
+        for row in rows:
+            counts[row['day']] = counts.get(row['day'], 0) + row['count']
+    return counts
+
+
+def _merge_counts(counts, new_counts):
+    """
+    Add the new {date: count} pairs to the cached ones.
+    """
+    merged = dict(counts)
+    for day, count in new_counts.items():
+        merged[day] = merged.get(day, 0) + count
+    return merged
+
+
+def _chunks(iterable, size):
+    """
+    Yield lists of at most `size` items from the iterable.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def backlog_age_distribution(user, now=None):
+    """
+    Return the number of open tasks of the user per age bucket as a {label: count} dict.
+    """
+    now = pd.Timestamp(now or timezone.now())
+    counts = pd.Series(0, index=BACKLOG_AGE_LABELS, dtype='int64')
+    created_dates = Task.objects.filter(user=user, completed=False).values_list('created_date', flat=True)
+    for chunk in _chunks(created_dates.iterator(chunk_size=CHUNK_SIZE), CHUNK_SIZE):
+        ages = (now - pd.to_datetime(pd.Series(chunk), utc=True)).dt.total_seconds() / 86400
+        buckets = pd.cut(ages, BACKLOG_AGE_BINS, labels=BACKLOG_AGE_LABELS, right=False)
+        counts = counts.add(buckets.value_counts(), fill_value=0).astype('int64')
+    return counts.to_dict()
+
+
+def refresh_user_analytics(user, now=None):
+    """
+    Bring the cached analytics of the user up to date and return them.
+    Only tasks created or completed since the previous refresh are aggregated;
+    archived tasks are only read when nothing is cached yet.
+
+    :param user: User - The user whose analytics are refreshed.
+    :param now: datetime - The current time the backlog ages are computed at (default: now).
+    """
+    now = now or timezone.now()
+    as_of = timezone.localdate(now)
+    tasks = Task.objects.filter(user=user)
+    cached = cache.get(_cache_key(user))
+    if cached is None:
+        cached = {'created': {}, 'completed': {}, 'backlog': None, 'open_tasks': None,
+                  'last_task_id': 0, 'last_completed': None}
+        sources = [tasks, ArchivedTask.objects.filter(user=user)]
+    else:
+        sources = [tasks]
+
+    # Fix the new watermarks first so rows written during the refresh are left for the next one.
+    last_task_id, last_completed = cached['last_task_id'], cached['last_completed']
+    for source in sources:
+        watermark = source.aggregate(Max('pk'), Max('completed_date'))
+        last_task_id = max(last_task_id, watermark['pk__max'] or 0)
+        completed_max = watermark['completed_date__max']
+        if completed_max is not None and (last_completed is None or completed_max > last_completed):
+            last_completed = completed_max
+
+    new_created = {}
+    if last_task_id != cached['last_task_id']:
+        created = [source.filter(pk__gt=cached['last_task_id'], pk__lte=last_task_id) for source in sources]
+        new_created = _daily_counts(created, 'created_date')
+    new_completed = {}
+    if last_completed != cached['last_completed']:
+        completed = [source.filter(completed_date__lte=last_completed) for source in sources]
+        if cached['last_completed'] is not None:
+            completed = [source.filter(completed_date__gt=cached['last_completed']) for source in completed]
+        new_completed = _daily_counts(completed, 'completed_date')
+
+    open_tasks = tasks.filter(completed=False).count()
+    # Backlog ages grow with time, so the distribution is also recomputed once a day.
+    changed = (new_created or new_completed or open_tasks != cached['open_tasks']
+               or cached.get('backlog_as_of') != as_of)
+    stats = {
+        'created': _merge_counts(cached['created'], new_created),
+        'completed': _merge_counts(cached['completed'], new_completed),
+        'backlog': backlog_age_distribution(user, now) if changed else cached['backlog'],
+        'backlog_as_of': as_of if changed else cached['backlog_as_of'],
+        'open_tasks': open_tasks,
+        'last_task_id': last_task_id,
+        'last_completed': last_completed,
+    }
+    cache.set(_cache_key(user), stats, CACHE_TIMEOUT)
+    return stats
+
+
+def completion_trend(stats, period='day'):
+    """
+    Return a DataFrame of created and completed task counts per day or week.
+    """
+    trend = pd.DataFrame({
+        'created': pd.Series(stats['created'], dtype='int64'),
+        'completed': pd.Series(stats['completed'], dtype='int64'),
+    }).fillna(0).astype('int64')
+    if trend.empty:
+        return trend
+    trend.index = pd.to_datetime(trend.index)
+    rule = 'W-MON' if period == 'week' else 'D'
+    return trend.sort_index().resample(rule, label='left', closed='left').sum()
@@ -0,0 +1,158 @@
+"""
+Archival of completed tasks for the task_manager application.
+
+Completed tasks are moved from the Task table into ArchivedTask in small
+batches so the hot table and its indexes only hold the tasks users work on.
+Each batch is copied with a single INSERT ... SELECT and then deleted, inside
+its own short transaction, and rows locked by a concurrent request are skipped
+and picked up by the next run. The tags of an archived task are kept as a list
+of tag ids on the archived row and linked again when the task is restored.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import Task, ArchivedTask, Attachment, Tag, TaskTag
+
+# ArchivedTask fields that have no counterpart in the Task table.
+ARCHIVE_ONLY_FIELDS = ('archived_at', 'tag_ids')
+
+
+def _columns():
+    """
+    Return the database columns shared by Task and ArchivedTask.
+    """
+    return [
+        field.column for field in ArchivedTask._meta.concrete_fields if field.name not in ARCHIVE_ONLY_FIELDS
+    ]
+
+
+def _copy_rows(source, target, pks, extra=None):
+    """
+    Copy the rows with the given primary keys from one table to the other with
+    a single INSERT ... SELECT.
+
+    :param source: The model the rows are copied from.
+    :param target: The model the rows are copied to.
+    :param pks: The primary keys of the rows to copy.
+    :param extra: Extra {field name: value} pairs set on the target rows only.
+    """
+    extra = {
+        target._meta.get_field(name).column: target._meta.get_field(name).get_db_prep_save(value, connection)
+        for name, value in (extra or {}).items()
+    }
+    quote = connection.ops.quote_name
+    columns = [quote(column) for column in _columns()]
+    placeholders = ', '.join(['%s'] * len(pks))
+    insert_columns = ', '.join(columns + [quote(column) for column in extra])
+    select_columns = ', '.join(columns + ['%s'] * len(extra))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(target._meta.db_table)} ({insert_columns}) '
+            f'SELECT {select_columns} FROM {quote(source._meta.db_table)} WHERE {quote("id")} IN ({placeholders})',
+            [*extra.values(), *pks],
+        )
+
+
+def _delete_rows(model, pks):
+    """
+    Delete the rows with the given primary keys with a single DELETE.
+    """
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote("id")} IN ({placeholders})',
+            pks,
+        )
+
+
+def _archive_rows(pks, archived_at):
+    """
+    Move the tasks with the given primary keys into the archive, keeping the
+    ids of their tags on the archived rows.
+    """
+    _copy_rows(Task, ArchivedTask, pks, extra={'archived_at': archived_at, 'tag_ids': []})
+    links = TaskTag.objects.filter(task_id__in=pks)
+    tag_ids = defaultdict(list)
+    for task_id, tag_id in links.order_by('task_id', 'tag_id').values_list('task_id', 'tag_id'):
+        tag_ids[task_id].append(tag_id)
+    if tag_ids:
+        ArchivedTask.objects.bulk_update(
+            [ArchivedTask(pk=pk, tag_ids=ids) for pk, ids in tag_ids.items()], ['tag_ids'],
+        )
+        links.delete()
+    _delete_rows(Task, pks)
+
+
+def _restore_rows(pks):
+    """
+    Move the archived tasks with the given primary keys back into the Task
+    table and link them to those of their tags that still exist.
+    """
+    _copy_rows(ArchivedTask, Task, pks)
+    tag_ids = {
+        pk: ids for pk, ids in ArchivedTask.objects.filter(pk__in=pks).values_list('pk', 'tag_ids') if ids
+    }
+    if tag_ids:
+        existing = set(Tag.objects.filter(
+            pk__in={tag_id for ids in tag_ids.values() for tag_id in ids}
+        ).values_list('pk', flat=True))
+        TaskTag.objects.bulk_create(
+            TaskTag(task_id=pk, tag_id=tag_id) for pk, ids in tag_ids.items() for tag_id in ids if tag_id in existing
+        )
+    _delete_rows(ArchivedTask, pks)
+
+
+def _move_in_batches(queryset, batch_size, move):
+    """
+    Lock the rows of the queryset batch by batch and pass their primary keys
+    to `move`, one batch per transaction. Return the number of rows moved.
+    """
+    moved = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                queryset.select_for_update(skip_locked=True).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                return moved
+            move(pks)
+        moved += len(pks)
+
+
+def archive_completed_tasks(older_than=None, batch_size=None, user=None):
+    """
+    Move tasks completed more than `older_than` ago into the archive.
+    Tasks with attachments stay in the Task table.
+
+    :param older_than: timedelta - Minimum time since completion (default: TASK_ARCHIVE_AFTER_DAYS).
+    :param batch_size: int - Number of tasks moved per transaction (default: TASK_ARCHIVE_BATCH_SIZE).
+    :param user: User - Only archive the tasks of this user.
+    :return: int - The number of archived tasks.
+    """
+    if older_than is None:
+        older_than = timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+    cutoff = timezone.now() - older_than
+    queryset = Task.objects.filter(completed=True, completed_date__lt=cutoff).exclude(
+        Exists(Attachment.objects.filter(task=OuterRef('pk')))
+    )
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    archived_at = timezone.now()
+    return _move_in_batches(
+        queryset, batch_size or settings.TASK_ARCHIVE_BATCH_SIZE, lambda pks: _archive_rows(pks, archived_at),
+    )
+
+
+def restore_archived_tasks(queryset, batch_size=None):
+    """
+    Move archived tasks back into the Task table with their original ids.
+
+    :param queryset: QuerySet - The ArchivedTask rows to restore.
+    :param batch_size: int - Number of tasks moved per transaction (default: TASK_ARCHIVE_BATCH_SIZE).
+    :return: int - The number of restored tasks.
+    """
+    return _move_in_batches(queryset, batch_size or settings.TASK_ARCHIVE_BATCH_SIZE, _restore_rows)
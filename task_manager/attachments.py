@@ -0,0 +1,155 @@
+"""
+Task attachments stored in S3-compatible object storage.
+
+Uploads never pass through the web workers: create_upload records a pending
+Attachment and returns a presigned POST that the browser sends straight to the
+bucket, and complete_upload confirms the object exists and queues the
+thumbnail job. Object keys start with `attachments/<user id>/<task id>/` so all
+files of a task or an account can be removed with a single prefix listing.
+"""
+import io
+import uuid
+from functools import lru_cache
+import boto3
+from PIL import Image
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from .models import Attachment
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Return the boto3 S3 client for the configured attachment storage.
+    Building a client is expensive and clients are thread-safe, so one is shared per process.
+    """
+    return boto3.client(
+        's3',
+        endpoint_url=settings.ATTACHMENT_S3_ENDPOINT_URL,
+        region_name=settings.ATTACHMENT_S3_REGION,
+    )
+
+
+def create_upload(task, filename, content_type, size):
+    """
+    Create a pending attachment and a presigned POST for uploading its file.
+
+    :param task: Task - The task the file is attached to.
+    :param filename: str - The original file name.
+    :param content_type: str - The MIME type the browser will send.
+    :param size: int - The file size in bytes.
+    :return: tuple - The Attachment and the presigned POST ({'url': ..., 'fields': {...}}).
+    """
+    filename = get_valid_filename(filename)
+    key = f'attachments/{task.user_id}/{task.pk}/{uuid.uuid4().hex}/{filename}'
+    post = get_s3_client().generate_presigned_post(
+        Bucket=settings.ATTACHMENT_BUCKET,
+        Key=key,
+        Fields={'Content-Type': content_type},
+        Conditions=[{'Content-Type': content_type}, ['content-length-range', 1, settings.ATTACHMENT_MAX_SIZE]],
+        ExpiresIn=settings.ATTACHMENT_URL_EXPIRES,
+    )
+    attachment = Attachment.objects.create(
+        task=task, key=key, filename=filename, content_type=content_type, size=size,
+    )
+    return attachment, post
+
+
+def complete_upload(attachment):
+    """
+    Mark an attachment as uploaded once its object exists in the bucket, and
+    queue thumbnail generation for images after the transaction commits.
+    """
+    from .tasks import generate_attachment_thumbnail
+
+    head = get_s3_client().head_object(Bucket=settings.ATTACHMENT_BUCKET, Key=attachment.key)
+    attachment.size = head['ContentLength']
+    attachment.uploaded_at = timezone.now()
+    attachment.save(update_fields=['size', 'uploaded_at'])
+    if attachment.content_type.startswith('image/'):
+        transaction.on_commit(lambda: generate_attachment_thumbnail.delay(attachment.pk))
+
+
+def download_url(key):
+    """
+    Return a presigned URL for downloading an object from the attachment bucket.
+    """
+    return get_s3_client().generate_presigned_url(
+        'get_object',
+        Params={'Bucket': settings.ATTACHMENT_BUCKET, 'Key': key},
+        ExpiresIn=settings.ATTACHMENT_URL_EXPIRES,
+    )
+
+
+def make_thumbnail(attachment):
+    """
+    Create a JPEG thumbnail of an image attachment and store it next to the original.
+    """
+    client = get_s3_client()
+    body = client.get_object(Bucket=settings.ATTACHMENT_BUCKET, Key=attachment.key)['Body'].read()
+    with Image.open(io.BytesIO(body)) as image:
+        image.thumbnail(settings.ATTACHMENT_THUMBNAIL_SIZE)
+        output = io.BytesIO()
+        image.convert('RGB').save(output, format='JPEG', quality=85)
+    thumbnail_key = f'{attachment.key}.thumbnail.jpg'
+    client.put_object(
+        Bucket=settings.ATTACHMENT_BUCKET, Key=thumbnail_key, Body=output.getvalue(), ContentType='image/jpeg',
+    )
+    attachment.thumbnail_key = thumbnail_key
+    attachment.save(update_fields=['thumbnail_key'])
+
+
+def _delete_objects(keys):
+    """
+    Delete the given objects from the attachment bucket, 1000 keys per request.
+    """
+    client = get_s3_client()
+    keys = list(keys)
+    for start in range(0, len(keys), 1000):
+        objects = [{'Key': key} for key in keys[start:start + 1000]]
+        client.delete_objects(Bucket=settings.ATTACHMENT_BUCKET, Delete={'Objects': objects})
+
+
+def _delete_prefix(prefix):
+    """
+    Delete every object of the attachment bucket whose key starts with the prefix.
+    """
+    if not settings.ATTACHMENT_BUCKET:
+        return
+    paginator = get_s3_client().get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=settings.ATTACHMENT_BUCKET, Prefix=prefix):
+        _delete_objects(item['Key'] for item in page.get('Contents', []))
+
+
+def delete_user_objects(user_id):
+    """
+    Delete every stored attachment object of a user.
+    """
+    _delete_prefix(f'attachments/{user_id}/')
+
+
+def delete_task_objects(user_id, task_id):
+    """
+    Delete every stored attachment object and thumbnail of a task.
+    """
+    _delete_prefix(f'attachments/{user_id}/{task_id}/')
+
+
+def sweep_pending_uploads(older_than):
+    """
+    Delete attachments whose upload was never completed, together with any
+    object the browser uploaded without confirming it.
+
+    :param older_than: timedelta - Minimum age of the pending attachments to delete.
+    :return: int - The number of deleted attachments.
+    """
+    pending = Attachment.objects.filter(uploaded_at__isnull=True, created_date__lt=timezone.now() - older_than)
+    deleted = 0
+    while batch := list(pending.order_by('pk').values_list('pk', 'key')[:1000]):
+        if settings.ATTACHMENT_BUCKET:
+            _delete_objects(key for _, key in batch)
+        Attachment.objects.filter(pk__in=[pk for pk, _ in batch]).delete()
+        deleted += len(batch)
+    return deleted
@@ -1,10 +1,11 @@
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.contrib.auth.hashers import make_password
 from .validators import CustomPasswordValidator
-from .models import Task
+from .models import Task, Tag, Priority
 
 class TaskForm(forms.ModelForm):
     """
@@ -15,7 +16,85 @@ class TaskForm(forms.ModelForm):
         Meta class for the TaskForm.
         """
         model = Task
-        fields = ['title', 'description', 'completed']
+        fields = ['title', 'description', 'priority', 'due_at', 'completed']
+        widgets = {
+            'due_at': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
+        }
+
+    tag_names = forms.CharField(
+        label='Tags', required=False, help_text='Comma-separated, e.g. work, urgent. New tags are created as needed.',
+    )
+
+    def __init__(self, *args, **kwargs):
+        """
+        Make the priority optional; tasks submitted without one get the default priority.
+        Fill in the current tags of an existing task.
+        """
+        super().__init__(*args, **kwargs)
+        self.fields['priority'].required = False
+        if self.instance.pk:
+            self.initial['tag_names'] = ', '.join(tag.name for tag in self.instance.tags.all())
+
+    def clean_priority(self):
+        """
+        Clean the priority field, falling back to the normal priority when none was chosen.
+        """
+        return self.cleaned_data['priority'] or Priority.NORMAL
+
+    def clean_tag_names(self):
+        """
+        Clean the tag_names field into a list of unique tag names in the order they were given.
+        """
+        names = []
+        for name in self.cleaned_data['tag_names'].split(','):
+            name = name.strip()
+            max_length = Tag._meta.get_field('name').max_length
+            if len(name) > max_length:
+                raise forms.ValidationError(f'Tag names must be {max_length} characters or fewer.')
+            if name and name not in names:
+                names.append(name)
+        return names
+
+    def save(self, commit=True):
+        """
+        Save the task, scheduling a new reminder when the due date changes.
+        """
+        if 'due_at' in self.changed_data:
+            self.instance.reminder_sent_at = None
+            self.instance.reminder_attempts = 0
+            self.instance.reminder_next_try_at = None
+        return super().save(commit)
+
+    def _save_m2m(self):
+        """
+        Save the task's tags, creating the tags of its user that do not exist yet.
+        """
+        super()._save_m2m()
+        user = self.instance.user
+        names = self.cleaned_data['tag_names']
+        tags = {tag.name: tag for tag in Tag.objects.filter(user=user, name__in=names)}
+        for name in names:
+            if name not in tags:
+                # get_or_create handles a concurrent save creating the same tag.
+                tags[name], _ = Tag.objects.get_or_create(user=user, name=name)
+        self.instance.tags.set(tags.values())
+
+class AttachmentUploadForm(forms.Form):
+    """
+    Form describing a file the browser is about to upload to a task.
+    """
+    filename = forms.CharField(max_length=255)
+    content_type = forms.CharField(max_length=255)
+    size = forms.IntegerField(min_value=1)
+
+    def clean_size(self):
+        """
+        Clean the size field by rejecting files larger than ATTACHMENT_MAX_SIZE.
+        """
+        size = self.cleaned_data['size']
+        if size > settings.ATTACHMENT_MAX_SIZE:
+            raise forms.ValidationError(f'Attachments must be {settings.ATTACHMENT_MAX_SIZE} bytes or smaller.')
+        return size
 
 class CustomSignupForm(forms.Form):
     """
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.archive import archive_completed_tasks, restore_archived_tasks
+from task_manager.models import ArchivedTask
+
+
+class Command(BaseCommand):
+    """
+    Move old completed tasks into the archive table, or restore them.
+    """
+    help = 'Archive completed tasks older than TASK_ARCHIVE_AFTER_DAYS, or restore archived tasks with --restore.'
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS,
+                            help='Archive tasks completed more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE,
+                            help='Number of tasks moved per transaction.')
+        parser.add_argument('--user', help='Only process the tasks of this username.')
+        parser.add_argument('--restore', action='store_true', help='Move archived tasks back into the task table.')
+
+    def handle(self, *args, **options):
+        """
+        Archive or restore the tasks and report how many were moved.
+        """
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        if options['restore']:
+            queryset = ArchivedTask.objects.all()
+            if user is not None:
+                queryset = queryset.filter(user=user)
+            restored = restore_archived_tasks(queryset, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Restored {restored} tasks.'))
+            return
+
+        archived = archive_completed_tasks(
+            older_than=timedelta(days=options['days']), batch_size=options['batch_size'], user=user,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} tasks.'))
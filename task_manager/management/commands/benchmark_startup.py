@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Measure the time from starting the gunicorn profile to its first successful response.
+    """
+    help = ('Start gunicorn with gunicorn.conf.py several times and report the time to the first '
+            'successful response, e.g. to track startup time across releases.')
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('--runs', type=int, default=3, help='Number of server starts to measure.')
+        parser.add_argument('--port', type=int, default=8765, help='Local port to bind the server to.')
+        parser.add_argument('--path', default='/login/', help='Path requested until it responds successfully.')
+        parser.add_argument('--workers', type=int, default=2, help='Number of gunicorn workers to start.')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for a response per run.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        """
+        Start the server the requested number of times and report the startup times.
+        """
+        timings = [self.measure(options) for _ in range(options['runs'])]
+        result = {
+            'path': options['path'],
+            'workers': options['workers'],
+            'runs': [round(timing, 3) for timing in timings],
+            'min': round(min(timings), 3),
+            'median': round(statistics.median(timings), 3),
+            'max': round(max(timings), 3),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.stdout.write(
+                f"Time to first response over {len(timings)} runs: "
+                f"min {result['min']}s, median {result['median']}s, max {result['max']}s"
+            )
+
+    def measure(self, options):
+        """
+        Start one server and return the seconds until it answers the path successfully.
+        """
+        env = {**os.environ, 'GUNICORN_WORKERS': str(options['workers'])}
+        env.setdefault('DJANGO_ALLOWED_HOSTS', '127.0.0.1')
+        url = f"http://127.0.0.1:{options['port']}{options['path']}"
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py'),
+             '--bind', f"127.0.0.1:{options['port']}", 'todo.wsgi'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - start < options['timeout']:
+                if server.poll() is not None:
+                    raise CommandError(f'gunicorn exited with status {server.returncode}.')
+                try:
+                    with urllib.request.urlopen(url, timeout=1):
+                        return time.perf_counter() - start
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.05)
+            raise CommandError(f"No successful response from {url} within {options['timeout']}s.")
+        finally:
+            server.terminate()
+            server.wait()
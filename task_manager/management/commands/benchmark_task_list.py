@@ -0,0 +1,67 @@
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from task_manager.models import Task
+from task_manager.views import TaskListView
+
+
+class Command(BaseCommand):
+    """
+    Compare the data fetched for one task list page with full rows and with the list projection.
+    """
+    help = ('Create a throw-away user with large task descriptions and report the bytes fetched and '
+            'memory used per task list page, for full Task rows and for the list projection. '
+            'All data is rolled back afterwards.')
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('--tasks', type=int, default=200, help='Number of tasks to create.')
+        parser.add_argument('--description-size', type=int, default=100 * 1024,
+                            help='Length of every task description in characters.')
+
+    def handle(self, *args, **options):
+        """
+        Create the benchmark data, measure both querysets and roll everything back.
+        """
+        with transaction.atomic():
+            user = User.objects.create_user(username='benchmark-task-list')
+            Task.objects.bulk_create(
+                (Task(user=user, title=f'Task {i}', description='x' * options['description_size'])
+                 for i in range(options['tasks'])),
+                batch_size=100,
+            )
+            request = RequestFactory().get('/tasks/')
+            request.user = user
+            view = TaskListView()
+            view.setup(request)
+
+            page_size = view.paginate_by
+            full = Task.objects.filter(user=user).order_by('title')[:page_size]
+            projected = view.get_queryset()[:page_size]
+
+            self.stdout.write(f'{"queryset":<12}{"bytes/page":>14}{"peak memory/page":>20}')
+            for name, queryset in (('full rows', full), ('projection', projected)):
+                fetched, peak = self.measure(queryset)
+                self.stdout.write(f'{name:<12}{fetched:>14,}{peak:>20,}')
+            transaction.set_rollback(True)
+
+    def measure(self, queryset):
+        """
+        Return the bytes of column data the query returns and the peak memory used to load the page.
+        """
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            fetched = sum(len(str(value).encode()) for row in cursor.fetchall() for value in row if value is not None)
+
+        tracemalloc.start()
+        try:
+            list(queryset.all())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return fetched, peak
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.accounts import delete_account
+
+
+class Command(BaseCommand):
+    """
+    Delete a user account and all of its tasks in bounded transactions.
+    """
+    help = 'Delete a user and their tasks in chunks. Re-run the command to resume an interrupted deletion.'
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('username', help='Username of the account to delete.')
+        parser.add_argument('--chunk-size', type=int, default=settings.ACCOUNT_DELETION_CHUNK_SIZE,
+                            help='Maximum number of rows deleted per transaction.')
+
+    def handle(self, *args, **options):
+        """
+        Delete the account and report the progress per chunk.
+        """
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"User {options['username']} does not exist.")
+
+        def progress(model, deleted, total):
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {deleted}/{total}')
+
+        deleted = delete_account(user, chunk_size=options['chunk_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f'Deleted account {options["username"]} and {deleted} rows.'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from task_manager.middleware import explain_query
+from task_manager.models import SlowQuery
+
+
+class Command(BaseCommand):
+    """
+    Replay captured slow queries and refresh their query plans, e.g. after index changes.
+    """
+    help = 'Re-run EXPLAIN (ANALYZE, BUFFERS) for captured slow queries and store the new plans.'
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('ids', nargs='*', type=int, help='Ids of the captured queries to replay (default: all).')
+        parser.add_argument('--view', help='Only replay queries captured from this view name.')
+
+    def handle(self, *args, **options):
+        """
+        Replay the selected queries and print the refreshed plans.
+        """
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans can only be captured on PostgreSQL.')
+
+        queries = SlowQuery.objects.all()
+        if options['ids']:
+            queries = queries.filter(pk__in=options['ids'])
+        if options['view']:
+            queries = queries.filter(view_name=options['view'])
+
+        for query in queries.iterator():
+            plan = explain_query(query.sql, query.params)
+            if not plan:
+                self.stderr.write(f'Query {query.pk} could not be explained.')
+                continue
+            query.plan = plan
+            query.explained_at = timezone.now()
+            query.save(update_fields=['plan', 'explained_at'])
+            self.stdout.write(f'Query {query.pk} ({query.view_name}, captured {query.duration_ms:.1f} ms):')
+            self.stdout.write(plan)
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from task_manager.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    """
+    Send due-date reminders, once or continuously.
+    """
+    help = ('Email reminders for tasks that are about to be due. Several instances can run at once; '
+            'each reminder is sent by exactly one of them.')
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('--once', action='store_true', help='Send the reminders due now and exit.')
+        parser.add_argument('--interval', type=int, default=settings.REMINDER_POLL_SECONDS,
+                            help='Seconds between polls when running continuously.')
+        parser.add_argument('--batch-size', type=int, default=settings.REMINDER_BATCH_SIZE,
+                            help='Maximum number of reminders claimed per transaction.')
+
+    def handle(self, *args, **options):
+        """
+        Run the reminder scheduler.
+        """
+        scheduler = ReminderScheduler(batch_size=options['batch_size'])
+        if options['once']:
+            sent = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent} reminders.'))
+            return
+        scheduler.run(interval=options['interval'])
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from task_manager.attachments import sweep_pending_uploads
+
+
+class Command(BaseCommand):
+    """
+    Delete attachments whose upload was started but never completed.
+    """
+    help = ('Delete pending attachments older than ATTACHMENT_PENDING_MAX_AGE_HOURS together with any '
+            'object uploaded for them without being confirmed.')
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('--hours', type=int, default=settings.ATTACHMENT_PENDING_MAX_AGE_HOURS,
+                            help='Delete pending attachments created more than this many hours ago.')
+
+    def handle(self, *args, **options):
+        """
+        Sweep the stale pending attachments and report how many were deleted.
+        """
+        deleted = sweep_pending_uploads(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} pending attachments.'))
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.analytics import refresh_user_analytics, completion_trend
+
+
+class Command(BaseCommand):
+    """
+    Refresh the cached task analytics of one or all users.
+    """
+    help = 'Refresh the cached productivity analytics, printing the trend when a single user is given.'
+
+    def add_arguments(self, parser):
+        """
+        Add the command line arguments.
+        """
+        parser.add_argument('--user', help='Only refresh and print the analytics of this username.')
+        parser.add_argument('--period', choices=['day', 'week'], default='week', help='Trend granularity to print.')
+
+    def handle(self, *args, **options):
+        """
+        Refresh the analytics and report the result.
+        """
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist.")
+            stats = refresh_user_analytics(user)
+            self.stdout.write(completion_trend(stats, options['period']).to_string())
+            for label, count in stats['backlog'].items():
+                self.stdout.write(f'{label}: {count}')
+            return
+
+        count = 0
+        for user in User.objects.filter(task__isnull=False).distinct().iterator():
+            refresh_user_analytics(user)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Refreshed analytics of {count} users.'))
@@ -0,0 +1,136 @@
+"""
+Middleware for the task_manager application.
+"""
+import json
+import logging
+import re
+import time
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+# Queries on these tables carry session keys and credentials in their
+# parameters, so they are never captured.
+SENSITIVE_TABLES = re.compile(r'\b(django_session|auth_\w+)\b')
+
+
+def explain_query(sql, params):
+    """
+    Return the EXPLAIN (ANALYZE, BUFFERS) output of a SELECT query.
+    Only PostgreSQL is supported; other backends and statements that would
+    lock or modify rows return an empty plan.
+    """
+    statement = sql.lstrip().upper()
+    if connection.vendor != 'postgresql' or not statement.startswith('SELECT') or 'FOR UPDATE' in statement:
+        return ''
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}', params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+    except DatabaseError as error:
+        logger.warning('Could not explain slow query: %s', error)
+        return ''
+
+
+def trim_slow_query_log(size):
+    """
+    Delete the oldest captured queries so that at most `size` remain.
+    """
+    stale = list(SlowQuery.objects.values_list('pk', flat=True)[size:])
+    if stale:
+        SlowQuery.objects.filter(pk__in=stale).delete()
+
+
+def _jsonable(params):
+    """
+    Return the query parameters in a form that can be stored in a JSONField.
+    """
+    params = list(params) if isinstance(params, (list, tuple)) else params or []
+    try:
+        json.dumps(params, cls=DjangoJSONEncoder)
+    except TypeError:
+        params = [str(param) for param in params]
+    return params
+
+
+class SlowQueryMiddleware:
+    """
+    Capture ORM queries slower than SLOW_QUERY_THRESHOLD_MS together with
+    the originating view and the request parameters; their query plans are
+    added in the background. Queries on session and auth tables are skipped.
+    Captures are kept in a ring buffer of SLOW_QUERY_LOG_SIZE rows.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """
+        Run the request with a query timer installed and store the slow queries afterwards.
+        """
+        threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+        if threshold is None:
+            return self.get_response(request)
+
+        captured = []
+
+        def timed_execute(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                if not many and duration_ms >= threshold and not SENSITIVE_TABLES.search(sql):
+                    captured.append((sql, params, duration_ms))
+
+        with connection.execute_wrapper(timed_execute):
+            response = self.get_response(request)
+
+        if captured:
+            # The log is a diagnostic aid and must never fail the request.
+            try:
+                self.store(request, captured)
+            except Exception:
+                logger.exception('Could not store slow queries.')
+        return response
+
+    def store(self, request, captured):
+        """
+        Save the captured queries and trim the log to its configured size.
+        The plans are not produced here: EXPLAIN ANALYZE runs the query again, so
+        on PostgreSQL they are queued for a Celery worker once the captures are committed.
+        :param request: The HTTP request object.
+        :param captured: A list of (sql, params, duration_ms) tuples.
+        """
+        from .tasks import explain_slow_queries
+
+        match = request.resolver_match
+        view_name = match.view_name if match else ''
+        request_params = {key: request.GET.getlist(key) for key in request.GET}
+        queries = SlowQuery.objects.bulk_create([
+            SlowQuery(
+                sql=sql,
+                params=_jsonable(params),
+                duration_ms=duration_ms,
+                view_name=view_name,
+                path=request.path,
+                request_params=request_params,
+            )
+            for sql, params, duration_ms in captured
+        ])
+        trim_slow_query_log(getattr(settings, 'SLOW_QUERY_LOG_SIZE', 500))
+        if connection.vendor == 'postgresql':
+            ids = [query.pk for query in queries]
+            transaction.on_commit(lambda: self.queue_explain(explain_slow_queries, ids))
+
+    def queue_explain(self, task, ids):
+        """
+        Queue the query plans of the stored captures, logging instead of raising when the broker is unavailable.
+        """
+        try:
+            task.delay(ids)
+        except Exception:
+            logger.exception('Could not queue the query plans of slow queries %s.', ids)
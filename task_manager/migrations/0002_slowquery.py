@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 19:14
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sql', models.TextField()),
+                ('params', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('duration_ms', models.FloatField()),
+                ('plan', models.TextField(blank=True)),
+                ('view_name', models.CharField(blank=True, max_length=255)),
+                ('path', models.CharField(blank=True, max_length=2048)),
+                ('request_params', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('captured_at', models.DateTimeField(auto_now_add=True)),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'slow queries',
+                'ordering': ['-captured_at', '-pk'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-19 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0006_tags'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_reminder_due_idx',
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='reminder_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='reminder_next_try_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reminder_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reminder_next_try_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('due_at__isnull', False), ('reminder_sent_at__isnull', True)), fields=['due_at', 'reminder_next_try_at'], name='task_reminder_due_idx'),
+        ),
+    ]
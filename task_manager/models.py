@@ -1,5 +1,17 @@
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+class Priority(models.IntegerChoices):
+    """
+    Priorities a task can have.
+    """
+    LOW = 1, 'Low'
+    NORMAL = 2, 'Normal'
+    HIGH = 3, 'High'
+
 
 class Task(models.Model):
     """
@@ -10,9 +22,168 @@ class Task(models.Model):
     description = models.TextField()
     completed = models.BooleanField(default=False)
     created_date = models.DateTimeField(auto_now_add=True)
+    completed_date = models.DateTimeField(null=True, blank=True)
+    priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.NORMAL)
+    due_at = models.DateTimeField(null=True, blank=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Failed reminder deliveries and when the next one may be tried.
+    reminder_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    reminder_next_try_at = models.DateTimeField(null=True, blank=True, editable=False)
+    tags = models.ManyToManyField('Tag', through='TaskTag', related_name='tasks', blank=True)
+
+    class Meta:
+        """
+        Meta class for the Task model.
+        """
+        indexes = [
+            models.Index(fields=['completed_date'], name='task_completed_date_idx', condition=Q(completed=True)),
+            # Only open tasks still waiting for their reminder are indexed, so
+            # the reminder scheduler's polling query stays small. The retry time
+            # is part of the index so failed reminders waiting for their next
+            # try are skipped without reading the table.
+            models.Index(
+                fields=['due_at', 'reminder_next_try_at'], name='task_reminder_due_idx',
+                condition=Q(completed=False, due_at__isnull=False, reminder_sent_at__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         """
         String representation of the task.
         """
-        return self.title
\ No newline at end of file
+        return self.title
+
+    def save(self, *args, **kwargs):
+        """
+        Keep completed_date in step with the completed flag before saving.
+        """
+        if not self.completed:
+            self.completed_date = None
+        elif self.completed_date is None:
+            self.completed_date = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'completed' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completed_date'}
+        super().save(*args, **kwargs)
+
+
+class ArchivedTask(models.Model):
+    """
+    Model representing a completed task moved out of the Task table.
+    The primary key is the id the task had, so it can be restored unchanged.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    completed = models.BooleanField(default=True)
+    created_date = models.DateTimeField()
+    completed_date = models.DateTimeField(null=True, blank=True)
+    priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.NORMAL)
+    due_at = models.DateTimeField(null=True, blank=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+    reminder_attempts = models.PositiveSmallIntegerField(default=0)
+    reminder_next_try_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+    # Ids of the task's tags, so they can be linked again when it is restored.
+    tag_ids = models.JSONField(default=list)
+
+    def __str__(self):
+        """
+        String representation of the archived task.
+        """
+        return self.title
+
+
+class Tag(models.Model):
+    """
+    Model representing a label a user can put on their tasks.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        """
+        Meta class for the Tag model.
+        """
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='tag_unique_name_per_user'),
+        ]
+
+    def __str__(self):
+        """
+        String representation of the tag.
+        """
+        return self.name
+
+
+class TaskTag(models.Model):
+    """
+    Model linking a task to one of its tags.
+    The two composite indexes serve both directions: (task, tag) for loading
+    the tags of a page of tasks and (tag, task) for filtering tasks by tag, so
+    the single-column foreign key indexes are not needed.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, db_index=False)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        """
+        Meta class for the TaskTag model.
+        """
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'tag'], name='tasktag_unique_task_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'task'], name='tasktag_tag_task_idx'),
+        ]
+
+
+class Attachment(models.Model):
+    """
+    Model representing a file attached to a task.
+    The file itself lives in object storage under `key`; only its metadata is stored here.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='attachments')
+    key = models.CharField(max_length=1024, unique=True)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    thumbnail_key = models.CharField(max_length=1024, blank=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+    uploaded_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        """
+        String representation of the attachment.
+        """
+        return self.filename
+
+
+class SlowQuery(models.Model):
+    """
+    Model representing an ORM query that exceeded the slow-query threshold.
+    """
+    sql = models.TextField()
+    params = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    duration_ms = models.FloatField()
+    plan = models.TextField(blank=True)
+    view_name = models.CharField(max_length=255, blank=True)
+    path = models.CharField(max_length=2048, blank=True)
+    request_params = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    captured_at = models.DateTimeField(auto_now_add=True)
+    explained_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """
+        Meta class for the SlowQuery model.
+        """
+        ordering = ['-captured_at', '-pk']
+        verbose_name_plural = 'slow queries'
+
+    def __str__(self):
+        """
+        String representation of the slow query.
+        """
+        return f'{self.view_name or self.path} ({self.duration_ms:.1f} ms)'
@@ -0,0 +1,124 @@
+"""
+Due-date reminders for the task_manager application.
+
+The scheduler polls for open tasks whose due date is within the reminder lead
+time and whose reminder has not been sent yet. The query matches the partial
+index `task_reminder_due_idx`, so it only ever reads tasks that still need a
+reminder. Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED: several
+scheduler processes can run at once, every task is locked by exactly one of
+them, and the reminder is marked as sent in the same transaction that sends it.
+Every message is sent on its own: when the mail server fails partway through a
+batch, only the reminders that went out are marked as sent. A failed reminder
+is retried after REMINDER_RETRY_MINUTES, doubling the delay after every
+further failure, and given up after REMINDER_MAX_ATTEMPTS attempts; while it
+waits it is not claimed, so it never holds up other reminders.
+"""
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """
+    Send due-date reminder emails in batches.
+
+    :param clock: callable - Returns the current time; replaced by a fake clock in tests.
+    :param batch_size: int - Maximum number of reminders claimed per transaction (default: REMINDER_BATCH_SIZE).
+    :param lead_time: timedelta - How long before the due date to remind (default: REMINDER_LEAD_MINUTES).
+    """
+    def __init__(self, clock=timezone.now, batch_size=None, lead_time=None, max_attempts=None, retry_delay=None):
+        self.clock = clock
+        self.batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        self.lead_time = lead_time if lead_time is not None else timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+        self.max_attempts = max_attempts or settings.REMINDER_MAX_ATTEMPTS
+        self.retry_delay = retry_delay or timedelta(minutes=settings.REMINDER_RETRY_MINUTES)
+
+    def due_tasks(self, now):
+        """
+        Return the queryset of tasks whose reminder is due at `now`, leaving out
+        failed reminders that are waiting for their next try or were given up.
+        """
+        return Task.objects.filter(
+            Q(reminder_next_try_at__isnull=True) | Q(reminder_next_try_at__lte=now),
+            completed=False, due_at__isnull=False, reminder_sent_at__isnull=True, due_at__lte=now + self.lead_time,
+            reminder_attempts__lt=self.max_attempts,
+        )
+
+    def send_batch(self):
+        """
+        Claim one batch of due reminders, send them and mark the ones that were sent.
+        Tasks of users without an email address are marked without sending. Failed
+        reminders are retried after an exponentially growing delay, up to max_attempts times.
+        Return the numbers of sent and failed reminders.
+        """
+        now = self.clock()
+        with transaction.atomic():
+            tasks = list(
+                self.due_tasks(now).select_for_update(skip_locked=True, of=('self',))
+                .select_related('user').order_by('due_at')[:self.batch_size]
+            )
+            if not tasks:
+                return 0, 0
+            sent, failed = [], []
+            with get_connection() as mail_connection:
+                for task in tasks:
+                    if task.user.email:
+                        try:
+                            mail_connection.send_messages([self.message(task)])
+                        except Exception:
+                            logger.exception('Could not send the reminder of task %s.', task.pk)
+                            failed.append(task)
+                            continue
+                    sent.append(task.pk)
+            Task.objects.filter(pk__in=sent).update(reminder_sent_at=now)
+            for task in failed:
+                task.reminder_attempts += 1
+                task.reminder_next_try_at = now + self.retry_delay * 2 ** (task.reminder_attempts - 1)
+                if task.reminder_attempts >= self.max_attempts:
+                    logger.error('Giving up on the reminder of task %s after %s attempts.',
+                                 task.pk, task.reminder_attempts)
+            Task.objects.bulk_update(failed, ['reminder_attempts', 'reminder_next_try_at'])
+        return len(sent), len(failed)
+
+    def message(self, task):
+        """
+        Return the reminder email for a task.
+        """
+        due = timezone.localtime(task.due_at).strftime('%Y-%m-%d %H:%M')
+        return EmailMessage(
+            subject=f'Reminder: {task.title} is due {due}',
+            body=f'Your task "{task.title}" is due {due}.',
+            to=[task.user.email],
+        )
+
+    def run_once(self):
+        """
+        Send every reminder that is due now, batch by batch. Return the number of sent reminders.
+        """
+        sent = 0
+        while True:
+            batch_sent, batch_failed = self.send_batch()
+            if not batch_sent and not batch_failed:
+                return sent
+            sent += batch_sent
+
+    def run(self, interval=None, sleep=time.sleep):
+        """
+        Poll for due reminders forever, sleeping `interval` seconds (default: REMINDER_POLL_SECONDS) between polls.
+        Errors of a poll, e.g. an unreachable mail server, are logged and the next poll runs as usual.
+        """
+        interval = interval or settings.REMINDER_POLL_SECONDS
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception('Sending reminders failed; retrying in %s seconds.', interval)
+            sleep(interval)
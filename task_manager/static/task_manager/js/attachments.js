@@ -0,0 +1,43 @@
+// Upload attachments straight to object storage: ask the server for a
+// presigned POST, send the file to the bucket, then confirm the upload.
+document.querySelectorAll('.attachment-upload').forEach(function (form) {
+    form.addEventListener('submit', function (event) {
+        event.preventDefault();
+        var file = form.querySelector('input[type="file"]').files[0];
+        if (!file) {
+            return;
+        }
+        var csrfToken = form.querySelector('[name="csrfmiddlewaretoken"]').value;
+        var description = new FormData();
+        description.append('filename', file.name);
+        description.append('content_type', file.type || 'application/octet-stream');
+        description.append('size', file.size);
+
+        fetch(form.action, {method: 'POST', headers: {'X-CSRFToken': csrfToken}, body: description})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw response;
+                }
+                return response.json();
+            })
+            .then(function (result) {
+                var upload = new FormData();
+                Object.keys(result.upload.fields).forEach(function (name) {
+                    upload.append(name, result.upload.fields[name]);
+                });
+                upload.append('file', file);
+                return fetch(result.upload.url, {method: 'POST', body: upload}).then(function (response) {
+                    if (!response.ok) {
+                        throw response;
+                    }
+                    return fetch(result.complete_url, {method: 'POST', headers: {'X-CSRFToken': csrfToken}});
+                });
+            })
+            .then(function () {
+                location.reload();
+            })
+            .catch(function () {
+                form.querySelector('.attachment-error').classList.remove('d-none');
+            });
+    });
+});
@@ -0,0 +1,46 @@
+// Shared page behaviour: tooltips, toasts, the dark/light theme toggle and the active nav link.
+(function () {
+    function applyTheme(theme) {
+        var dark = theme === 'dark';
+        document.querySelector('html').setAttribute('data-bs-theme', dark ? 'dark' : 'light');
+
+        var themeIcon = document.getElementById('themeIcon');
+        if (themeIcon) {
+            themeIcon.classList.toggle('fa-moon', dark);
+            themeIcon.classList.toggle('fa-sun', !dark);
+        }
+
+        var table = document.getElementById('table');
+        if (table) {
+            table.classList.toggle('table-dark', dark);
+            table.classList.toggle('table-light', !dark);
+        }
+    }
+
+    function toggleDarkTheme() {
+        var theme = localStorage.getItem('theme') === 'dark' ? 'light' : 'dark';
+        localStorage.setItem('theme', theme);
+        applyTheme(theme);
+    }
+
+    [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]')).forEach(function (tooltipTriggerEl) {
+        new bootstrap.Tooltip(tooltipTriggerEl);
+    });
+
+    [].slice.call(document.querySelectorAll('.toast')).forEach(function (toastEl) {
+        new bootstrap.Toast(toastEl).show();
+    });
+
+    applyTheme(localStorage.getItem('theme'));
+
+    var themeToggleBtn = document.getElementById('themeToggleBtn');
+    if (themeToggleBtn) {
+        themeToggleBtn.addEventListener('click', toggleDarkTheme);
+    }
+
+    // Mark the nav link of the current page as active.
+    var navLink = document.getElementById(document.body.dataset.navPath);
+    if (navLink) {
+        navLink.classList.add('active');
+    }
+})();
@@ -0,0 +1,6 @@
+// Submit the toggle-complete form as soon as a task checkbox changes.
+document.querySelectorAll('.toggle-complete-checkbox').forEach(function (checkbox) {
+    checkbox.addEventListener('change', function () {
+        this.closest('form').submit();
+    });
+});
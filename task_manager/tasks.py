@@ -0,0 +1,57 @@
+"""
+Celery tasks for the task_manager application.
+"""
+from celery import shared_task
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .accounts import delete_account
+from .attachments import delete_task_objects, make_thumbnail
+from .middleware import explain_query
+from .models import Attachment, SlowQuery
+
+
+@shared_task
+def generate_attachment_thumbnail(attachment_id):
+    """
+    Generate the thumbnail of an uploaded image attachment.
+    :param attachment_id: The primary key of the attachment.
+    """
+    attachment = Attachment.objects.filter(pk=attachment_id, uploaded_at__isnull=False).first()
+    if attachment is not None and not attachment.thumbnail_key:
+        make_thumbnail(attachment)
+
+
+@shared_task
+def delete_task_attachments(user_id, task_id):
+    """
+    Delete the stored attachment objects of a deleted task.
+    :param user_id: The primary key of the task's user.
+    :param task_id: The primary key of the deleted task.
+    """
+    delete_task_objects(user_id, task_id)
+
+
+@shared_task
+def explain_slow_queries(slow_query_ids):
+    """
+    Store the query plans of captured slow queries that have not been explained yet.
+    :param slow_query_ids: The primary keys of the captured queries.
+    """
+    for query in SlowQuery.objects.filter(pk__in=slow_query_ids, explained_at__isnull=True):
+        plan = explain_query(query.sql, query.params)
+        if plan:
+            query.plan = plan
+            query.explained_at = timezone.now()
+            query.save(update_fields=['plan', 'explained_at'])
+
+
+@shared_task
+def delete_user_account(user_id):
+    """
+    Delete a user account with the chunked account deletion pipeline.
+    An interrupted deletion resumes when the task is queued again.
+    :param user_id: The primary key of the user.
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        delete_account(user)
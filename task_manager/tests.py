@@ -1,8 +1,39 @@
 # library/tests.py
-from django.test import TestCase
-from django.urls import reverse
+import io
+import os
+import runpy
+import smtplib
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+from botocore.exceptions import ClientError
+from PIL import Image
+from django.apps import apps as django_apps
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Task
+from django.contrib.messages import get_messages
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from todo.warmup import compile_templates, warm_up
+from .models import Task, SlowQuery, ArchivedTask, Attachment, Priority, Tag, TaskTag
+from .accounts import delete_account
+from .analytics import refresh_user_analytics, completion_trend
+from .archive import archive_completed_tasks, restore_archived_tasks
+from .attachments import get_s3_client
+from .middleware import SlowQueryMiddleware
+from .reminders import ReminderScheduler
+from .tasks import (
+    delete_task_attachments, delete_user_account, explain_slow_queries, generate_attachment_thumbnail,
+)
 
 class TaskAuthTests(TestCase):
     """
@@ -127,3 +158,928 @@ class TaskTests(TestCase):
         self.assertEqual(response.status_code, 302)  # Redirect after successful form submission
         self.task.refresh_from_db()
         self.assertEqual(self.task.completed, True)
+
+
+class SlowQueryLogTests(TestCase):
+    """
+    Test the slow-query middleware and its ring buffer.
+    """
+    def setUp(self):
+        """
+        Set up the test environment by creating and logging in a test user with a task.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        Task.objects.create(title='Test Task', description='Test Description', user=self.user)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_captured_with_request_context(self):
+        """
+        Every query is captured when the threshold is zero, together with the view and request parameters.
+        """
+        self.client.get(reverse('task_list'), {'q': 'Test', 'order_by': 'title', 'dir': 'desc'})
+        captured = SlowQuery.objects.filter(view_name='task_list')
+        self.assertTrue(captured.exists())
+        self.assertTrue(captured.filter(sql__icontains='task_manager_task').exists())
+        self.assertEqual(captured.first().request_params, {'q': ['Test'], 'order_by': ['title'], 'dir': ['desc']})
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_SIZE=3)
+    def test_slow_query_log_is_bounded(self):
+        """
+        The log never grows beyond SLOW_QUERY_LOG_SIZE entries.
+        """
+        for _ in range(3):
+            self.client.get(reverse('task_list'))
+        self.assertEqual(SlowQuery.objects.count(), 3)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=10000)
+    def test_fast_queries_are_not_captured(self):
+        """
+        Queries below the threshold are not stored.
+        """
+        self.client.get(reverse('task_list'))
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_plans_are_explained_after_the_request(self):
+        """
+        The middleware only stores the captures and queues their plans for the worker after commit.
+        """
+        request = RequestFactory().get('/tasks/')
+        request.resolver_match = None
+        with mock.patch('task_manager.middleware.explain_query') as explain, \
+                mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(explain_slow_queries, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                SlowQueryMiddleware(None).store(request, [('SELECT 1', [], 250.0)])
+        explain.assert_not_called()
+        query = SlowQuery.objects.get()
+        self.assertEqual(query.plan, '')
+        delay.assert_called_once_with([query.pk])
+
+        with mock.patch('task_manager.tasks.explain_query', return_value='Result  (actual time=0.01..0.01)'):
+            explain_slow_queries([query.pk])
+        query.refresh_from_db()
+        self.assertEqual(query.plan, 'Result  (actual time=0.01..0.01)')
+        self.assertIsNotNone(query.explained_at)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_session_and_auth_queries_are_not_captured(self):
+        """
+        Queries whose parameters carry session keys or credentials are never stored.
+        """
+        self.client.get(reverse('task_list'))
+        self.assertTrue(SlowQuery.objects.exists())
+        self.assertFalse(SlowQuery.objects.filter(sql__contains='django_session').exists())
+        self.assertFalse(SlowQuery.objects.filter(sql__contains='auth_user').exists())
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_capture_failures_do_not_fail_the_request(self):
+        """
+        Errors while storing captures or queueing their plans are logged and the request still succeeds.
+        """
+        with mock.patch.object(SlowQueryMiddleware, 'store', side_effect=DatabaseError), \
+                self.assertLogs('task_manager.middleware', 'ERROR'):
+            response = self.client.get(reverse('task_list'))
+        self.assertEqual(response.status_code, 200)
+
+        request = RequestFactory().get('/tasks/')
+        request.resolver_match = None
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(explain_slow_queries, 'delay', side_effect=ConnectionError), \
+                self.assertLogs('task_manager.middleware', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                SlowQueryMiddleware(None).store(request, [('SELECT 1', [], 250.0)])
+        self.assertTrue(SlowQuery.objects.filter(sql='SELECT 1').exists())
+
+    def test_reexplain_command(self):
+        """
+        The command refreshes the plans of the selected captures and requires PostgreSQL.
+        """
+        with self.assertRaises(CommandError):
+            call_command('reexplain_slow_queries')
+
+        listed = SlowQuery.objects.create(sql='SELECT 1', params=[], duration_ms=250, view_name='task_list')
+        detail = SlowQuery.objects.create(sql='SELECT 2', params=[], duration_ms=250, view_name='task_detail')
+        output = io.StringIO()
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch('task_manager.management.commands.reexplain_slow_queries.explain_query',
+                           return_value='Result') as explain:
+            call_command('reexplain_slow_queries', view='task_list', stdout=output)
+        explain.assert_called_once_with('SELECT 1', [])
+        listed.refresh_from_db()
+        detail.refresh_from_db()
+        self.assertEqual(listed.plan, 'Result')
+        self.assertEqual(detail.plan, '')
+        self.assertIn(f'Query {listed.pk} (task_list', output.getvalue())
+
+
+class TaskArchiveTests(TestCase):
+    """
+    Test moving completed tasks into the archive and back.
+    """
+    def setUp(self):
+        """
+        Set up the test environment with an open task, a recently completed task and two old completed tasks.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        self.open_task = Task.objects.create(title='Open Task', description='Open', user=self.user)
+        self.recent_task = Task.objects.create(title='Recent Task', description='Recent', user=self.user, completed=True)
+        self.old_tasks = [
+            Task.objects.create(title=f'Old Task {i}', description='Old', user=self.user, completed=True)
+            for i in range(2)
+        ]
+        Task.objects.filter(pk__in=[task.pk for task in self.old_tasks]).update(
+            completed_date=timezone.now() - timedelta(days=120)
+        )
+
+    def test_completed_date_follows_completed_flag(self):
+        """
+        completed_date is set when a task is completed and cleared when it is reopened.
+        """
+        self.assertIsNotNone(self.recent_task.completed_date)
+        self.recent_task.completed = False
+        self.recent_task.save(update_fields=['completed'])
+        self.recent_task.refresh_from_db()
+        self.assertIsNone(self.recent_task.completed_date)
+
+    def test_backfill_treats_existing_completions_as_recent(self):
+        """
+        The migration backfill dates existing completions at migration time, so old tasks are not archived at once.
+        """
+        backfill_completed_date = import_module('task_manager.migrations.0003_task_archive').backfill_completed_date
+        Task.objects.filter(pk=self.recent_task.pk).update(
+            created_date=timezone.now() - timedelta(days=400), completed_date=None
+        )
+        backfill_completed_date(django_apps, None)
+        self.recent_task.refresh_from_db()
+        self.assertGreater(self.recent_task.completed_date, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(archive_completed_tasks(older_than=timedelta(days=90)), 2)
+
+    def test_archive_moves_only_old_completed_tasks(self):
+        """
+        Only tasks completed before the cutoff are moved, keeping their ids and creation dates.
+        """
+        archived = archive_completed_tasks(older_than=timedelta(days=90), batch_size=1)
+        self.assertEqual(archived, 2)
+        self.assertQuerySetEqual(Task.objects.order_by('pk'), [self.open_task, self.recent_task])
+        for task in self.old_tasks:
+            archived_task = ArchivedTask.objects.get(pk=task.pk)
+            self.assertEqual(archived_task.title, task.title)
+            self.assertEqual(archived_task.created_date, task.created_date)
+
+    def test_restore_moves_tasks_back(self):
+        """
+        Restoring puts archived tasks back in the task table with their original ids.
+        """
+        archive_completed_tasks(older_than=timedelta(days=90))
+        restored = restore_archived_tasks(ArchivedTask.objects.all())
+        self.assertEqual(restored, 2)
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertEqual(Task.objects.get(pk=self.old_tasks[0].pk).title, 'Old Task 0')
+
+    def test_task_list_includes_archived_tasks_on_request(self):
+        """
+        Archived tasks are hidden by default and listed with archived=1.
+        """
+        archive_completed_tasks(older_than=timedelta(days=90))
+        response = self.client.get(reverse('task_list'))
+        self.assertNotContains(response, 'Old Task 0')
+        response = self.client.get(reverse('task_list'), {'archived': '1', 'order_by': 'title', 'dir': 'desc'})
+        titles = [task['title'] for task in response.context['object_list']]
+        self.assertEqual(titles, ['Recent Task', 'Open Task', 'Old Task 1', 'Old Task 0'])
+        self.assertContains(response, reverse('task_restore', args=[self.old_tasks[0].pk]))
+
+    def test_task_restore_view(self):
+        """
+        The restore view moves a single archived task of the current user back.
+        """
+        archive_completed_tasks(older_than=timedelta(days=90))
+        response = self.client.post(reverse('task_restore', args=[self.old_tasks[0].pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Task.objects.filter(pk=self.old_tasks[0].pk).exists())
+        self.assertTrue(ArchivedTask.objects.filter(pk=self.old_tasks[1].pk).exists())
+
+
+class AccountDeletionTests(TestCase):
+    """
+    Test the chunked account deletion pipeline.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Set up the test data once: a user owning 100k tasks and a second user with one task.
+        """
+        cls.user = User.objects.create_user(username='heavyuser', password='testpass')
+        cls.other_user = User.objects.create_user(username='otheruser', password='testpass')
+        cls.other_task = Task.objects.create(title='Other Task', description='Other', user=cls.other_user)
+        Task.objects.bulk_create(
+            (Task(title=f'Task {i}', description='Description', user=cls.user) for i in range(100000)),
+            batch_size=5000,
+        )
+        ArchivedTask.objects.create(id=10 ** 9, title='Archived', description='Archived', user=cls.user,
+                                    created_date=timezone.now())
+
+    def test_delete_account_memory_is_bounded(self):
+        """
+        Deleting a 100k-task account keeps peak memory well below what loading the tasks would need.
+        """
+        progress = []
+        tracemalloc.start()
+        try:
+            deleted = delete_account(self.user, chunk_size=5000, progress=lambda *args: progress.append(args))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(deleted, 100001)
+        self.assertLess(peak, 2 * 1024 * 1024)
+        self.assertEqual(progress[-2], (Task, 100000, 100000))
+        self.assertEqual(len(progress), 21)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertQuerySetEqual(Task.objects.all(), [self.other_task])
+
+    def test_admin_action_queues_deletion(self):
+        """
+        The admin action deactivates the selected accounts and hands their deletion to the worker.
+        """
+        User.objects.create_superuser(username='admin', password='adminpass')
+        self.client.login(username='admin', password='adminpass')
+        with mock.patch.object(delete_user_account, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('admin:auth_user_changelist'), {
+                    'action': 'delete_accounts', '_selected_action': [self.other_user.pk],
+                })
+        self.assertEqual(response.status_code, 302)
+        delay.assert_called_once_with(self.other_user.pk)
+        message = str(next(iter(get_messages(response.wsgi_request))))
+        self.assertIn('queued them for deletion', message)
+        self.assertNotIn('interrupted', message)
+        self.other_user.refresh_from_db()
+        self.assertFalse(self.other_user.is_active)
+
+        delete_user_account(self.other_user.pk)
+        self.assertFalse(User.objects.filter(pk=self.other_user.pk).exists())
+        self.assertFalse(Task.objects.filter(pk=self.other_task.pk).exists())
+
+    def test_delete_account_resumes_partial_deletion(self):
+        """
+        Running the deletion again after a partial run finishes the remaining rows.
+        """
+        Task.objects.filter(pk__in=Task.objects.filter(user=self.user).values('pk')[:50000]).delete()
+        delete_account(self.user)
+        self.assertFalse(Task.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(ArchivedTask.objects.filter(user_id=self.user.pk).exists())
+
+
+class StaticPipelineTests(TestCase):
+    """
+    Test the production static files pipeline.
+    """
+    def setUp(self):
+        """
+        Set up the test environment by logging in a test user and collecting the static files into a temporary directory.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        settings_override = override_settings(
+            STATIC_ROOT=static_root.name,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.static_root = static_root.name
+
+    def test_hashed_assets_are_precompressed_and_immutable(self):
+        """
+        Pages reference hashed file names that have gzip and brotli variants and are served as immutable.
+        """
+        response = self.client.get(reverse('task_list'))
+        script = next(
+            src for src in response.content.decode().split('"')
+            if src.startswith('/static/task_manager/js/task_list.') and src.endswith('.js')
+        )
+        self.assertNotEqual(script, '/static/task_manager/js/task_list.js')
+        path = script[len('/static/'):]
+        for suffix in ('', '.gz', '.br'):
+            self.assertTrue(os.path.exists(os.path.join(self.static_root, path + suffix)))
+        response = self.client.get(script)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+
+
+class FakeS3Client:
+    """
+    Stand-in for the boto3 S3 client that keeps objects in a local directory.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def upload(self, key, body):
+        """
+        Store an object the way a browser upload to a presigned POST would.
+        """
+        os.makedirs(os.path.dirname(self.path(key)), exist_ok=True)
+        with open(self.path(key), 'wb') as file:
+            file.write(body)
+
+    def generate_presigned_post(self, Bucket, Key, Fields, Conditions, ExpiresIn):
+        return {'url': f'https://{Bucket}.s3.test/', 'fields': {**Fields, 'key': Key}}
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        return f"https://{Params['Bucket']}.s3.test/{Params['Key']}?signature=test"
+
+    def head_object(self, Bucket, Key):
+        if not os.path.exists(self.path(Key)):
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+        return {'ContentLength': os.path.getsize(self.path(Key))}
+
+    def get_object(self, Bucket, Key):
+        with open(self.path(Key), 'rb') as file:
+            return {'Body': io.BytesIO(file.read())}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.upload(Key, Body)
+
+    def delete_objects(self, Bucket, Delete):
+        for item in Delete['Objects']:
+            if os.path.exists(self.path(item['Key'])):
+                os.remove(self.path(item['Key']))
+
+    def get_paginator(self, operation_name):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = [
+            os.path.relpath(os.path.join(directory, name), self.root)
+            for directory, _, names in os.walk(self.root) for name in names
+        ]
+        yield {'Contents': [{'Key': key} for key in sorted(keys) if key.startswith(Prefix)]}
+
+
+@override_settings(ATTACHMENT_BUCKET='attachments')
+class AttachmentTests(TestCase):
+    """
+    Test presigned attachment uploads and thumbnail generation against a local filesystem stand-in.
+    """
+    def setUp(self):
+        """
+        Set up the test environment with a logged in user, a task and a fake S3 client.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        self.task = Task.objects.create(title='Test Task', description='Test Description', user=self.user)
+        bucket = tempfile.TemporaryDirectory()
+        self.addCleanup(bucket.cleanup)
+        self.s3 = FakeS3Client(bucket.name)
+        patcher = mock.patch('task_manager.attachments.get_s3_client', return_value=self.s3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def png(self):
+        """
+        Return the bytes of a small PNG image.
+        """
+        output = io.BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(output, format='PNG')
+        return output.getvalue()
+
+    def test_presigned_upload_flow(self):
+        """
+        The browser gets a presigned POST, uploads directly, and completing the upload queues the thumbnail job.
+        """
+        body = self.png()
+        response = self.client.post(
+            reverse('attachment_upload', args=[self.task.id]),
+            {'filename': 'photo.png', 'content_type': 'image/png', 'size': len(body)},
+        )
+        self.assertEqual(response.status_code, 200)
+        upload = response.json()
+        key = upload['upload']['fields']['key']
+        self.assertTrue(key.startswith(f'attachments/{self.user.pk}/{self.task.pk}/'))
+
+        self.s3.upload(key, body)
+        with mock.patch.object(generate_attachment_thumbnail, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(upload['complete_url'])
+        self.assertEqual(response.status_code, 200)
+        attachment = Attachment.objects.get(pk=upload['id'])
+        self.assertIsNotNone(attachment.uploaded_at)
+        self.assertEqual(attachment.size, len(body))
+        delay.assert_called_once_with(attachment.pk)
+
+        response = self.client.get(reverse('task_detail', args=[self.task.id]))
+        self.assertContains(response, 'photo.png')
+
+    def test_complete_without_upload_fails(self):
+        """
+        Completing an attachment whose file never reached the bucket is rejected.
+        """
+        response = self.client.post(
+            reverse('attachment_upload', args=[self.task.id]),
+            {'filename': 'notes.txt', 'content_type': 'text/plain', 'size': 10},
+        )
+        response = self.client.post(response.json()['complete_url'])
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(Attachment.objects.get().uploaded_at)
+
+    @override_settings(ATTACHMENT_MAX_SIZE=100)
+    def test_upload_size_is_limited(self):
+        """
+        Files larger than ATTACHMENT_MAX_SIZE are refused before any upload URL is issued.
+        """
+        response = self.client.post(
+            reverse('attachment_upload', args=[self.task.id]),
+            {'filename': 'big.bin', 'content_type': 'application/octet-stream', 'size': 101},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attachment.objects.exists())
+
+    def test_generate_thumbnail(self):
+        """
+        The thumbnail job stores a resized JPEG next to the original image.
+        """
+        attachment = Attachment.objects.create(
+            task=self.task, key='attachments/1/1/a/photo.png', filename='photo.png',
+            content_type='image/png', size=0, uploaded_at=timezone.now(),
+        )
+        self.s3.upload(attachment.key, self.png())
+        generate_attachment_thumbnail(attachment.pk)
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.thumbnail_key, 'attachments/1/1/a/photo.png.thumbnail.jpg')
+        with Image.open(self.s3.path(attachment.thumbnail_key)) as thumbnail:
+            self.assertEqual(thumbnail.size, (256, 192))
+
+    def test_deleting_a_task_removes_its_objects(self):
+        """
+        Deleting a task queues the removal of its files and thumbnails, leaving other tasks' files alone.
+        """
+        other_task = Task.objects.create(title='Other Task', description='Test', user=self.user)
+        key = f'attachments/{self.user.pk}/{self.task.pk}/a/photo.png'
+        other_key = f'attachments/{self.user.pk}/{other_task.pk}/b/notes.txt'
+        Attachment.objects.create(task=self.task, key=key, filename='photo.png', content_type='image/png',
+                                  size=3, uploaded_at=timezone.now(), thumbnail_key=f'{key}.thumbnail.jpg')
+        for object_key in (key, f'{key}.thumbnail.jpg', other_key):
+            self.s3.upload(object_key, b'abc')
+        with mock.patch.object(delete_task_attachments, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('task_delete', args=[self.task.id]))
+        self.assertEqual(response.status_code, 302)
+        delay.assert_called_once_with(self.user.pk, self.task.pk)
+        delete_task_attachments(self.user.pk, self.task.pk)
+        self.assertFalse(os.path.exists(self.s3.path(key)))
+        self.assertFalse(os.path.exists(self.s3.path(f'{key}.thumbnail.jpg')))
+        self.assertTrue(os.path.exists(self.s3.path(other_key)))
+
+    def test_sweep_pending_uploads(self):
+        """
+        Stale pending attachments and their unconfirmed objects are deleted; recent and completed ones are kept.
+        """
+        def attachment(name, uploaded, age):
+            created = Attachment.objects.create(
+                task=self.task, key=f'attachments/{self.user.pk}/{self.task.pk}/{name}', filename=name,
+                content_type='text/plain', size=3, uploaded_at=timezone.now() if uploaded else None,
+            )
+            Attachment.objects.filter(pk=created.pk).update(created_date=timezone.now() - age)
+            self.s3.upload(created.key, b'abc')
+            return created
+
+        stale = attachment('stale.txt', False, timedelta(days=2))
+        recent = attachment('recent.txt', False, timedelta(minutes=5))
+        uploaded = attachment('uploaded.txt', True, timedelta(days=2))
+        output = io.StringIO()
+        call_command('sweep_pending_attachments', stdout=output)
+        self.assertIn('Deleted 1 pending attachments.', output.getvalue())
+        self.assertQuerySetEqual(Attachment.objects.order_by('pk'), [recent, uploaded])
+        self.assertFalse(os.path.exists(self.s3.path(stale.key)))
+        self.assertTrue(os.path.exists(self.s3.path(recent.key)))
+
+    def test_s3_client_is_shared(self):
+        """
+        The S3 client is built once per process and reused.
+        """
+        get_s3_client.cache_clear()
+        self.addCleanup(get_s3_client.cache_clear)
+        with mock.patch('boto3.client') as client:
+            self.assertIs(get_s3_client(), get_s3_client())
+        client.assert_called_once()
+
+
+class TaskListProjectionTests(TestCase):
+    """
+    Test that the task list only fetches a prefix of task descriptions.
+    """
+    def setUp(self):
+        """
+        Set up the test environment by logging in a test user with tasks that have long descriptions.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        for i in range(8):
+            Task.objects.create(title=f'Task {i}', description='Long description ' * 1000, user=self.user)
+
+    def test_task_list_defers_description(self):
+        """
+        Listed tasks carry a SQL-computed preview instead of the description, without extra queries per row.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task_list'))
+        tasks = list(response.context['object_list'])
+        self.assertEqual(len(tasks), 8)
+        self.assertIn('description', tasks[0].get_deferred_fields())
+        self.assertEqual(tasks[0].description_preview, 'Long description')
+        self.assertContains(response, 'Long descripti…')
+        self.assertEqual(
+            len([query for query in queries.captured_queries if '"task_manager_task"' in query['sql']]), 2
+        )
+
+    def test_benchmark_command(self):
+        """
+        The benchmark command reports both querysets and leaves no data behind.
+        """
+        output = io.StringIO()
+        call_command('benchmark_task_list', tasks=3, description_size=1000, stdout=output)
+        self.assertIn('projection', output.getvalue())
+        self.assertFalse(User.objects.filter(username='benchmark-task-list').exists())
+
+
+class TaskAnalyticsTests(TestCase):
+    """
+    Test the per-user productivity analytics and their incremental refresh.
+    """
+    def setUp(self):
+        """
+        Set up the test environment with a logged in user whose tasks span two days.
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        now = timezone.now()
+        self.today, self.yesterday = now.date(), (now - timedelta(days=1)).date()
+        tasks = [Task.objects.create(title=f'Task {i}', description='Test', user=self.user) for i in range(3)]
+        Task.objects.filter(pk=tasks[0].pk).update(
+            created_date=now - timedelta(days=1), completed=True, completed_date=now - timedelta(days=1),
+        )
+        Task.objects.filter(pk=tasks[1].pk).update(created_date=now - timedelta(days=40))
+
+    def test_analytics_counts(self):
+        """
+        Created and completed tasks are counted per day and open tasks are bucketed by age.
+        """
+        stats = refresh_user_analytics(self.user)
+        trend = completion_trend(stats)
+        self.assertEqual(trend['created'].sum(), 3)
+        self.assertEqual(trend.loc[str(self.yesterday), 'completed'], 1)
+        self.assertEqual(stats['backlog']['< 1 day'], 1)
+        self.assertEqual(stats['backlog']['30-90 days'], 1)
+        self.assertEqual(stats['open_tasks'], 2)
+
+    def test_refresh_only_reads_new_data(self):
+        """
+        A refresh adds the tasks created and completed since the cached watermark.
+        """
+        refresh_user_analytics(self.user)
+        task = Task.objects.create(title='New Task', description='Test', user=self.user)
+        task.completed = True
+        task.save()
+        stats = refresh_user_analytics(self.user)
+        self.assertEqual(stats['created'][self.today], 2)
+        self.assertEqual(stats['completed'][self.today], 1)
+        self.assertEqual(stats['last_task_id'], task.pk)
+        with self.assertNumQueries(2):
+            refresh_user_analytics(self.user)
+
+    def test_backlog_ages_follow_the_clock(self):
+        """
+        An unchanged backlog is still recomputed on a later day, so tasks move into older buckets.
+        """
+        clock = FakeClock(timezone.now())
+        self.assertEqual(refresh_user_analytics(self.user, now=clock())['backlog']['< 1 day'], 1)
+        clock.advance(timedelta(days=45))
+        stats = refresh_user_analytics(self.user, now=clock())
+        self.assertEqual(stats['backlog']['< 1 day'], 0)
+        self.assertEqual(stats['backlog']['30-90 days'], 2)
+
+    def test_analytics_view(self):
+        """
+        The analytics page renders the weekly trend and the backlog.
+        """
+        response = self.client.get(reverse('task_analytics'), {'period': 'week'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(row['created'] for row in response.context['trend']), 3)
+        self.assertContains(response, '30-90 days')
+
+
+class WarmUpTests(TestCase):
+    """
+    Test the server warm-up hooks.
+    """
+    def test_warm_up_compiles_templates(self):
+        """
+        Warm-up compiles the application templates without touching the database.
+        """
+        with self.assertNumQueries(0):
+            warm_up()
+        self.assertGreaterEqual(compile_templates(), 10)
+
+    def test_asgi_profile_disables_persistent_connections(self):
+        """
+        The gunicorn profile turns off persistent connections and the per-worker connection for uvicorn workers.
+        """
+        profile = str(settings.BASE_DIR / 'gunicorn.conf.py')
+        with mock.patch.dict(os.environ, {'GUNICORN_WORKER_CLASS': 'uvicorn.workers.UvicornWorker'}):
+            config = runpy.run_path(profile)
+            self.assertEqual(os.environ['POSTGREDB_CONN_MAX_AGE'], '0')
+        with mock.patch('todo.warmup.warm_up_worker') as warm_up_worker:
+            config['post_worker_init'](None)
+        warm_up_worker.assert_not_called()
+
+        with mock.patch.dict(os.environ, {'POSTGREDB_CONN_MAX_AGE': '60'}):
+            config = runpy.run_path(profile)
+            self.assertEqual(os.environ['POSTGREDB_CONN_MAX_AGE'], '60')
+        self.assertEqual(config['worker_class'], 'sync')
+
+
+class FakeClock:
+    """
+    Clock returning a fixed time that tests move forward explicitly.
+    """
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, delta):
+        self.now += delta
+
+
+class TaskDueDateTests(TestCase):
+    """
+    Test due dates, priorities and the reminder scheduler.
+    """
+    def setUp(self):
+        """
+        Set up the test environment with a logged in user and tasks with and without due dates.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass', email='testuser@example.com')
+        self.client.login(username='testuser', password='testpass')
+        self.clock = FakeClock(timezone.now())
+        self.due_task = Task.objects.create(
+            title='Due Task', description='Test', user=self.user, priority=Priority.HIGH,
+            due_at=self.clock.now + timedelta(hours=2),
+        )
+        self.later_task = Task.objects.create(
+            title='Later Task', description='Test', user=self.user, priority=Priority.LOW,
+            due_at=self.clock.now + timedelta(days=2),
+        )
+        self.undated_task = Task.objects.create(title='Undated Task', description='Test', user=self.user)
+
+    def test_reminders_are_sent_once_when_due(self):
+        """
+        A reminder is sent once the due date is within the lead time, and never twice.
+        """
+        scheduler = ReminderScheduler(clock=self.clock, lead_time=timedelta(hours=1))
+        self.assertEqual(scheduler.run_once(), 0)
+        self.clock.advance(timedelta(minutes=90))
+        self.assertEqual(scheduler.run_once(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Due Task', mail.outbox[0].subject)
+        self.assertEqual(mail.outbox[0].to, ['testuser@example.com'])
+        self.due_task.refresh_from_db()
+        self.assertEqual(self.due_task.reminder_sent_at, self.clock.now)
+        self.assertEqual(scheduler.run_once(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_reminders_skip_completed_tasks_and_run_in_batches(self):
+        """
+        Completed tasks get no reminder and due reminders are claimed batch by batch.
+        """
+        self.due_task.completed = True
+        self.due_task.save()
+        self.clock.advance(timedelta(days=3))
+        scheduler = ReminderScheduler(clock=self.clock, batch_size=1, lead_time=timedelta(0))
+        self.assertEqual(scheduler.send_batch(), (1, 0))
+        self.assertEqual(scheduler.send_batch(), (0, 0))
+        self.assertEqual(mail.outbox[0].subject.split(' is due')[0], 'Reminder: Later Task')
+
+    def test_failed_reminders_are_retried_without_resending(self):
+        """
+        When the mail server fails partway through a batch, only the sent reminders are marked
+        and the failed one is retried once its retry delay has passed.
+        """
+        self.clock.advance(timedelta(days=3))
+        scheduler = ReminderScheduler(clock=self.clock, lead_time=timedelta(0), retry_delay=timedelta(minutes=5))
+        locmem_send = LocmemEmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if 'Later Task' in messages[0].subject:
+                raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+            return locmem_send(backend, messages)
+
+        with mock.patch.object(LocmemEmailBackend, 'send_messages', send_messages), \
+                self.assertLogs('task_manager.reminders', 'ERROR'):
+            self.assertEqual(scheduler.run_once(), 1)
+        self.assertEqual([message.subject.split(' is due')[0] for message in mail.outbox], ['Reminder: Due Task'])
+        self.later_task.refresh_from_db()
+        self.assertIsNone(self.later_task.reminder_sent_at)
+        self.assertEqual(self.later_task.reminder_attempts, 1)
+
+        self.assertEqual(scheduler.run_once(), 0)
+        self.clock.advance(timedelta(minutes=5))
+        self.assertEqual(scheduler.run_once(), 1)
+        self.assertEqual([message.subject.split(' is due')[0] for message in mail.outbox],
+                         ['Reminder: Due Task', 'Reminder: Later Task'])
+
+    def test_refused_reminders_do_not_block_others(self):
+        """
+        Reminders the mail server keeps refusing back off, are given up after the maximum
+        number of attempts and never hold up reminders behind them, even when they fill a batch.
+        """
+        refused = User.objects.create_user(username='refused', password='testpass', email='refused@invalid')
+        for i in range(2):
+            Task.objects.create(title=f'Refused Task {i}', description='Test', user=refused,
+                                due_at=self.clock.now - timedelta(days=1))
+        scheduler = ReminderScheduler(clock=self.clock, batch_size=2, lead_time=timedelta(hours=3),
+                                      max_attempts=2, retry_delay=timedelta(minutes=5))
+        locmem_send = LocmemEmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if messages[0].to == ['refused@invalid']:
+                raise smtplib.SMTPRecipientsRefused({'refused@invalid': (550, b'No such user')})
+            return locmem_send(backend, messages)
+
+        with mock.patch.object(LocmemEmailBackend, 'send_messages', send_messages), \
+                self.assertLogs('task_manager.reminders', 'ERROR') as logs:
+            self.assertEqual(scheduler.run_once(), 1)
+            self.clock.advance(timedelta(minutes=5))
+            self.assertEqual(scheduler.run_once(), 0)
+            self.clock.advance(timedelta(days=1))
+            self.assertEqual(scheduler.run_once(), 0)
+        self.assertEqual([message.to for message in mail.outbox], [['testuser@example.com']])
+        self.assertEqual(len([line for line in logs.output if 'Giving up' in line]), 2)
+        self.assertEqual(list(Task.objects.filter(user=refused).values_list('reminder_attempts', flat=True)), [2, 2])
+
+    def test_run_survives_mail_server_outage(self):
+        """
+        The polling loop logs a failed poll, e.g. an unreachable mail server, and keeps polling.
+        """
+        self.clock.advance(timedelta(days=3))
+        scheduler = ReminderScheduler(clock=self.clock, lead_time=timedelta(0))
+        sleep = mock.Mock(side_effect=[None, KeyboardInterrupt])
+        with mock.patch.object(LocmemEmailBackend, 'open', side_effect=ConnectionRefusedError), \
+                self.assertLogs('task_manager.reminders', 'ERROR'):
+            with self.assertRaises(KeyboardInterrupt):
+                scheduler.run(interval=1, sleep=sleep)
+        self.assertEqual(sleep.call_count, 2)
+        self.due_task.refresh_from_db()
+        self.assertIsNone(self.due_task.reminder_sent_at)
+        self.assertEqual(self.due_task.reminder_attempts, 0)
+
+    def test_changing_due_date_reschedules_reminder(self):
+        """
+        Editing the due date of a task clears its sent reminder.
+        """
+        Task.objects.filter(pk=self.due_task.pk).update(reminder_sent_at=self.clock.now)
+        response = self.client.post(reverse('task_update', args=[self.due_task.id]), {
+            'title': 'Due Task', 'description': 'Test', 'priority': Priority.HIGH,
+            'due_at': (self.clock.now + timedelta(days=5)).strftime('%Y-%m-%dT%H:%M'),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.due_task.refresh_from_db()
+        self.assertIsNone(self.due_task.reminder_sent_at)
+
+    def test_task_list_sorts_by_due_date_and_priority(self):
+        """
+        The task list sorts by due date with undated tasks last, and by priority.
+        """
+        response = self.client.get(reverse('task_list'), {'order_by': 'due_at', 'dir': 'desc'})
+        self.assertEqual([task.title for task in response.context['object_list']],
+                         ['Later Task', 'Due Task', 'Undated Task'])
+        response = self.client.get(reverse('task_list'), {'order_by': 'priority', 'dir': 'desc', 'archived': '1'})
+        self.assertEqual([task['title'] for task in response.context['object_list']],
+                         ['Due Task', 'Undated Task', 'Later Task'])
+        response = self.client.get(reverse('task_list'), {'order_by': 'user__password'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['object_list'][0].title, 'Due Task')
+
+
+class TaskTagTests(TestCase):
+    """
+    Test tagging tasks and filtering the task list by tags.
+    """
+    def setUp(self):
+        """
+        Set up the test environment with a logged in user whose tasks are tagged work, home or both.
+        """
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.client.login(username='testuser', password='testpass')
+        self.work = Tag.objects.create(user=self.user, name='work')
+        self.home = Tag.objects.create(user=self.user, name='home')
+        self.work_task = Task.objects.create(title='Work Task', description='Test', user=self.user)
+        self.home_task = Task.objects.create(title='Home Task', description='Test', user=self.user)
+        self.both_task = Task.objects.create(title='Both Task', description='Test', user=self.user)
+        self.untagged_task = Task.objects.create(title='Untagged Task', description='Test', user=self.user)
+        self.work_task.tags.add(self.work)
+        self.home_task.tags.add(self.home)
+        self.both_task.tags.add(self.work, self.home)
+        other = User.objects.create_user(username='otheruser', password='testpass')
+        Task.objects.create(title='Other Task', description='Test', user=other).tags.add(
+            Tag.objects.create(user=other, name='work')
+        )
+
+    def list_titles(self, params):
+        """
+        Return the titles of the tasks listed for the given query parameters.
+        """
+        response = self.client.get(reverse('task_list'), params)
+        return [task.title for task in response.context['object_list']]
+
+    def test_filter_by_any_tag(self):
+        """
+        Tasks having any of the selected tags of the user are listed.
+        """
+        self.assertEqual(self.list_titles({'tag': 'work'}), ['Both Task', 'Work Task'])
+        self.assertEqual(self.list_titles({'tag': ['work', 'home']}), ['Both Task', 'Home Task', 'Work Task'])
+
+    def test_filter_by_all_tags(self):
+        """
+        Only tasks having every selected tag are listed, and an unknown tag matches nothing.
+        """
+        self.assertEqual(self.list_titles({'tag': ['work', 'home'], 'tag_mode': 'all'}), ['Both Task'])
+        self.assertEqual(self.list_titles({'tag': ['work', 'missing'], 'tag_mode': 'all'}), [])
+
+    def test_tag_chips_take_constant_queries(self):
+        """
+        The tags of a page are prefetched, so more tagged tasks do not add queries.
+        """
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('task_list'))
+        for i in range(4):
+            Task.objects.create(title=f'Task {i}', description='Test', user=self.user).tags.add(self.work, self.home)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse('task_list'))
+        self.assertEqual(len(many), len(few))
+        self.assertContains(response, '>work</span>', count=6)
+        with CaptureQueriesContext(connection) as archived:
+            response = self.client.get(reverse('task_list'), {'archived': '1'})
+        self.assertEqual(len(archived), len(many))
+        self.assertContains(response, '>home</span>', count=6)
+
+    def test_link_table_is_indexed_for_filtering(self):
+        """
+        The link table has composite indexes for both lookup directions.
+        """
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, TaskTag._meta.db_table)
+        indexed = [
+            constraint['columns'] for constraint in constraints.values() if constraint['index'] or constraint['unique']
+        ]
+        self.assertIn(['tag_id', 'task_id'], indexed)
+        self.assertIn(['task_id', 'tag_id'], indexed)
+
+    def test_form_sets_tags(self):
+        """
+        Tags are entered as comma-separated names; missing tags are created for the user.
+        """
+        response = self.client.post(reverse('task_update', args=[self.untagged_task.id]), {
+            'title': 'Untagged Task', 'description': 'Test', 'tag_names': 'home, errands, home',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(sorted(tag.name for tag in self.untagged_task.tags.all()), ['errands', 'home'])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 3)
+        response = self.client.get(reverse('task_update', args=[self.untagged_task.id]))
+        self.assertEqual(response.context['form'].initial['tag_names'], 'errands, home')
+
+    def test_archive_and_restore_keep_tags(self):
+        """
+        Archiving a tagged task stores its tag ids and restoring it links the tags again.
+        """
+        Task.objects.filter(pk=self.both_task.pk).update(
+            completed=True, completed_date=timezone.now() - timedelta(days=120)
+        )
+        self.assertEqual(archive_completed_tasks(older_than=timedelta(days=90)), 1)
+        self.assertFalse(TaskTag.objects.filter(task_id=self.both_task.pk).exists())
+        self.assertEqual(
+            sorted(ArchivedTask.objects.get(pk=self.both_task.pk).tag_ids), sorted([self.work.pk, self.home.pk])
+        )
+        self.home.delete()
+        self.assertEqual(restore_archived_tasks(ArchivedTask.objects.all()), 1)
+        self.assertEqual(list(Task.objects.get(pk=self.both_task.pk).tags.all()), [self.work])
+
+    def test_delete_account_removes_tags(self):
+        """
+        Deleting an account removes its tags and tag links.
+        """
+        delete_account(self.user)
+        self.assertFalse(Tag.objects.filter(name='home').exists())
+        self.assertEqual(TaskTag.objects.count(), 1)
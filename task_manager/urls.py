@@ -2,7 +2,8 @@ from django.urls import path
 from django.views.generic.base import RedirectView
 from .views import (
     TaskListView, TaskDetailView, TaskCreateView, TaskUpdateView, TaskDeleteView,
-    CustomSignupView, CustomLoginView, CustomLogoutView, TaskToggleCompleteView
+    CustomSignupView, CustomLoginView, CustomLogoutView, TaskToggleCompleteView, TaskRestoreView,
+    AttachmentUploadView, AttachmentCompleteView, AttachmentDownloadView, TaskAnalyticsView
 )
 
 urlpatterns = [
@@ -15,5 +16,10 @@ urlpatterns = [
     path('task/update/<int:pk>/', TaskUpdateView.as_view(), name='task_update'),
     path('task/delete/<int:pk>/', TaskDeleteView.as_view(), name='task_delete'),
     path('task/<int:pk>/', TaskDetailView.as_view(), name='task_detail'),
+    path('tasks/analytics/', TaskAnalyticsView.as_view(), name='task_analytics'),
     path('tasks/toggle_complete/<int:pk>/', TaskToggleCompleteView.as_view(), name='toggle_complete'),
+    path('tasks/restore/<int:pk>/', TaskRestoreView.as_view(), name='task_restore'),
+    path('task/<int:pk>/attachments/', AttachmentUploadView.as_view(), name='attachment_upload'),
+    path('attachments/<int:pk>/complete/', AttachmentCompleteView.as_view(), name='attachment_complete'),
+    path('attachments/<int:pk>/', AttachmentDownloadView.as_view(), name='attachment_download'),
 ]
@@ -1,14 +1,23 @@
 from typing import Any
 from django.db.models.query import QuerySet
+from botocore.exceptions import ClientError
+from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, View, FormView, DetailView
-from django.urls import reverse_lazy
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, View, FormView, DetailView, TemplateView
+from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
 from django.contrib.auth import login, logout
 from django.contrib import messages
-from django.db.models import Q
-from .models import Task
-from .forms import TaskForm, CustomSignupForm, CustomLoginForm
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q, Value
+from django.db.models.functions import Substr
+from .models import Task, ArchivedTask, Attachment, Tag, TaskTag
+from .archive import restore_archived_tasks
+from .attachments import create_upload, complete_upload, download_url
+from .analytics import refresh_user_analytics, completion_trend
+from .tasks import delete_task_attachments
+from .forms import TaskForm, AttachmentUploadForm, CustomSignupForm, CustomLoginForm
 from .mixins import TaskExistsMixin
 
 class TaskListView(LoginRequiredMixin, ListView):
@@ -20,39 +29,139 @@ class TaskListView(LoginRequiredMixin, ListView):
     context_object_name = 'tasks'
     paginate_by = 8
     ordering = ['title']
+    # Columns the list shows. The description is only shown truncated, so
+    # just a prefix long enough for the template's truncatechars is fetched.
+    list_fields = ['id', 'title', 'completed', 'created_date', 'priority', 'due_at']
+    description_preview_length = 16
+    sortable_fields = ['title', 'description', 'completed', 'priority', 'due_at']
     
     def get_queryset(self):
         """
-        Return the queryset after filtering based on the request parameters 'q', 'order_by', and 'dir'.
+        Return the queryset after filtering based on the request parameters 'q', 'tag', 'tag_mode', 'order_by',
+        'dir' and 'archived'.
+        When archived tasks are included the result is a union of task and archived task values.
         """
         query = self.request.GET.get('q')
         order_by = self.request.GET.get('order_by', 'title')
         dir = self.request.GET.get('dir', 'asc')
+        if order_by not in self.sortable_fields:
+            order_by = 'title'
 
-        queryset = Task.objects.filter(user=self.request.user)
+        tasks = self.filter_tags(Task.objects.filter(user=self.request.user))
+        queryset = self.project(self.search(tasks, query))
 
+        # Archived tasks keep no tag links, so they are only listed when no tag filter is active.
+        if self.include_archived() and not self.selected_tags():
+            fields = [*self.list_fields, 'description_preview', 'archived']
+            archived = self.project(self.search(ArchivedTask.objects.filter(user=self.request.user), query))
+            queryset = queryset.annotate(archived=Value(False)).values(*fields).union(
+                archived.annotate(archived=Value(True)).values(*fields)
+            )
+            # A union can only be ordered by the columns it selects.
+            if order_by == 'description':
+                order_by = 'description_preview'
+        else:
+            # The tag chips of a page are loaded with one extra query instead of one per task.
+            queryset = queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('id', 'name'), to_attr='tag_list')
+            )
+
+        # Tasks without a due date sort after the others in both directions.
+        if dir == 'asc':
+            queryset = queryset.order_by(F(order_by).asc(nulls_last=True))
+        elif dir == 'desc':
+            queryset = queryset.order_by(F(order_by).desc(nulls_last=True))
+
+        return queryset
+
+    def project(self, queryset):
+        """
+        Return the queryset limited to the list columns, with a description prefix computed in SQL.
+        """
+        return queryset.only(*self.list_fields).annotate(
+            description_preview=Substr('description', 1, self.description_preview_length)
+        )
+
+    def search(self, queryset, query):
+        """
+        Return the queryset filtered by the search query on title and description.
+        """
         if query:
             queryset = queryset.filter(
                 Q(title__icontains=query) |
                 Q(description__icontains=query)
             )
+        return queryset
 
-        if order_by:
-            if dir == 'asc':
-                queryset = queryset.order_by(order_by)
-            elif dir == 'desc':
-                queryset = queryset.order_by(f'-{order_by}')
+    def selected_tags(self):
+        """
+        Return the tag names requested with the repeatable 'tag' parameter.
+        """
+        return [name for name in dict.fromkeys(self.request.GET.getlist('tag')) if name]
 
-        return queryset
+    def tag_mode(self):
+        """
+        Return 'all' when tasks must have every selected tag and 'any' when one of them is enough.
+        """
+        return 'all' if self.request.GET.get('tag_mode') == 'all' else 'any'
+
+    def filter_tags(self, queryset):
+        """
+        Return the queryset filtered by the selected tags.
+        The tags are resolved to ids first, so the task filter is a semi-join that
+        only reads the (tag, task) index of the link table.
+        """
+        names = self.selected_tags()
+        if not names:
+            return queryset
+        tag_ids = list(Tag.objects.filter(user=self.request.user, name__in=names).values_list('id', flat=True))
+        if self.tag_mode() == 'all' and len(tag_ids) < len(names):
+            return queryset.none()
+        links = TaskTag.objects.filter(tag_id__in=tag_ids)
+        if self.tag_mode() == 'all':
+            links = links.values('task_id').annotate(tag_count=Count('tag_id')).filter(tag_count=len(tag_ids))
+        return queryset.filter(pk__in=links.values('task_id'))
+
+    def attach_tags(self, tasks):
+        """
+        Load the tags of the task rows of a union page, which cannot be prefetched, with a single query.
+        """
+        rows = [task for task in tasks if isinstance(task, dict)]
+        for row in rows:
+            row['tag_list'] = []
+        by_id = {row['id']: row for row in rows if not row['archived']}
+        if by_id:
+            links = TaskTag.objects.filter(task_id__in=by_id).order_by('tag__name')
+            for task_id, tag_id, name in links.values_list('task_id', 'tag_id', 'tag__name'):
+                by_id[task_id]['tag_list'].append(Tag(id=tag_id, name=name))
+
+    def include_archived(self):
+        """
+        Return whether archived tasks were requested with the 'archived' parameter.
+        """
+        return self.request.GET.get('archived') == '1'
 
     def get_context_data(self, **kwargs):
         """
-        Return the context data with additional order_by, dir, and search_query parameters.
+        Return the context data with additional order_by, dir, search_query, include_archived and tag parameters.
+        `filter_query` holds the archived and tag parameters, ready to be prefixed to the sorting and paging links.
         """
         context = super().get_context_data(**kwargs)
+        self.attach_tags(context['object_list'])
         context['order_by'] = self.request.GET.get('order_by', 'title')
         context['dir'] = self.request.GET.get('dir', 'asc')
         context['search_query'] = self.request.GET.get('q')
+        context['include_archived'] = self.include_archived()
+        context['tags'] = Tag.objects.filter(user=self.request.user).only('id', 'name')
+        context['selected_tags'] = self.selected_tags()
+        context['tag_mode'] = self.tag_mode()
+        filters = {'tag': context['selected_tags']}
+        if context['include_archived']:
+            filters['archived'] = '1'
+        if context['selected_tags'] and context['tag_mode'] == 'all':
+            filters['tag_mode'] = 'all'
+        filter_query = urlencode(filters, doseq=True)
+        context['filter_query'] = f'{filter_query}&' if filter_query else ''
         return context
 
     
@@ -69,6 +178,17 @@ class TaskDetailView(LoginRequiredMixin, TaskExistsMixin, DetailView):
         Return the queryset of Task objects filtered by the current user.
         """
         return Task.objects.filter(user=self.request.user)
+
+    def get_context_data(self, **kwargs):
+        """
+        Return the context data with the uploaded attachments of the task and their thumbnail URLs.
+        """
+        context = super().get_context_data(**kwargs)
+        attachments = list(self.object.attachments.filter(uploaded_at__isnull=False).order_by('created_date'))
+        for attachment in attachments:
+            attachment.thumbnail_url = download_url(attachment.thumbnail_key) if attachment.thumbnail_key else None
+        context['attachments'] = attachments
+        return context
     
     def get(self, request, *args, **kwargs):
         """
@@ -107,15 +227,75 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
 
 class TaskToggleCompleteView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        task = Task.objects.get(pk=pk, user=request.user)
+        task = get_object_or_404(Task.objects.only('id', 'completed', 'completed_date'), pk=pk, user=request.user)
         task.completed = not task.completed
-        task.save()
+        task.save(update_fields=['completed'])
         if task.completed:
             messages.success(request, f'Task completed successfully.', extra_tags='bg-success')
         else:
             messages.success(request, f'Task reopened successfully.', extra_tags='bg-success')
         return redirect(reverse_lazy('task_list'))
 
+class TaskRestoreView(LoginRequiredMixin, View):
+    """
+    View for moving an archived task back into the task list.
+    """
+    def post(self, request, pk):
+        """
+        Restore the archived task of the current user and redirect to the task list.
+        """
+        if restore_archived_tasks(ArchivedTask.objects.filter(pk=pk, user=request.user)):
+            messages.success(request, 'Task restored successfully.', extra_tags='bg-success')
+        else:
+            messages.error(request, 'Task not found.', extra_tags='bg-danger')
+        return redirect(reverse_lazy('task_list'))
+
+class AttachmentUploadView(LoginRequiredMixin, View):
+    """
+    View returning a presigned POST the browser uses to upload a file straight to object storage.
+    """
+    def post(self, request, pk):
+        """
+        Validate the file description, create a pending attachment and return its upload parameters.
+        """
+        task = get_object_or_404(Task, pk=pk, user=request.user)
+        form = AttachmentUploadForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        attachment, upload = create_upload(task, **form.cleaned_data)
+        return JsonResponse({
+            'id': attachment.pk,
+            'upload': upload,
+            'complete_url': reverse('attachment_complete', args=[attachment.pk]),
+        })
+
+class AttachmentCompleteView(LoginRequiredMixin, View):
+    """
+    View called by the browser once the direct upload of an attachment has finished.
+    """
+    def post(self, request, pk):
+        """
+        Confirm the uploaded object and mark the attachment as uploaded.
+        """
+        attachment = get_object_or_404(Attachment, pk=pk, task__user=request.user, uploaded_at__isnull=True)
+        try:
+            complete_upload(attachment)
+        except ClientError:
+            return JsonResponse({'errors': {'file': ['The file has not been uploaded.']}}, status=400)
+        messages.success(request, f'Attachment {attachment.filename} added successfully.', extra_tags='bg-success')
+        return JsonResponse({'id': attachment.pk})
+
+class AttachmentDownloadView(LoginRequiredMixin, View):
+    """
+    View redirecting to a short-lived download URL of an attachment.
+    """
+    def get(self, request, pk):
+        """
+        Redirect to the presigned URL of the attachment of the current user.
+        """
+        attachment = get_object_or_404(Attachment, pk=pk, task__user=request.user, uploaded_at__isnull=False)
+        return redirect(download_url(attachment.key))
+
 class TaskUpdateView(LoginRequiredMixin, TaskExistsMixin, UpdateView):
     """
     Update view for tasks.
@@ -152,8 +332,7 @@ class TaskUpdateView(LoginRequiredMixin, TaskExistsMixin, UpdateView):
         """
         
         response = super().form_valid(form)
-        obj = self.get_object()
-        messages.success(self.request, f'Task {obj.title} edited successfully.', extra_tags='bg-success')
+        messages.success(self.request, f'Task {self.object.title} edited successfully.', extra_tags='bg-success')
 
         return response
 
@@ -169,7 +348,16 @@ class TaskDeleteView(LoginRequiredMixin, TaskExistsMixin, DeleteView):
         """
         Return the queryset of Task objects filtered by the current user.
         """
-        return Task.objects.filter(user=self.request.user)
+        return Task.objects.filter(user=self.request.user).only('id', 'title')
+
+    def form_valid(self, form):
+        """
+        Delete the task and, once the deletion is committed, queue the removal of its stored attachment files.
+        """
+        if self.object.attachments.exists():
+            user_id, task_id = self.request.user.pk, self.object.pk
+            transaction.on_commit(lambda: delete_task_attachments.delay(user_id, task_id))
+        return super().form_valid(form)
     
     def get(self, request, *args, **kwargs):
         """
@@ -188,10 +376,33 @@ class TaskDeleteView(LoginRequiredMixin, TaskExistsMixin, DeleteView):
         """
         Return the success URL for the view. 
         """
-        obj = self.get_object()
-        messages.success(self.request, f'Task {obj.title} has been deleted successfully.', extra_tags='bg-success')
+        messages.success(self.request, f'Task {self.object.title} has been deleted successfully.', extra_tags='bg-success')
         return super().get_success_url()
 
+class TaskAnalyticsView(LoginRequiredMixin, TemplateView):
+    """
+    View showing task creation and completion trends and the age of the open backlog.
+    """
+    template_name = 'task_analytics.html'
+    trend_length = 30
+
+    def get_context_data(self, **kwargs):
+        """
+        Return the context data with the trend for the requested 'period' (day or week) and the backlog ages.
+        """
+        context = super().get_context_data(**kwargs)
+        period = 'week' if self.request.GET.get('period') == 'week' else 'day'
+        stats = refresh_user_analytics(self.request.user)
+        trend = completion_trend(stats, period).tail(self.trend_length)
+        context['period'] = period
+        context['trend'] = [
+            {'start': start.date(), 'created': created, 'completed': completed}
+            for start, created, completed in trend[::-1].itertuples()
+        ]
+        context['backlog'] = stats['backlog'].items()
+        context['open_tasks'] = stats['open_tasks']
+        return context
+
 class CustomSignupView(FormView):
     """
     View for signing up a user.
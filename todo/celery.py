@@ -0,0 +1,18 @@
+"""
+Celery application for todo project.
+
+Background jobs (such as attachment thumbnails) are defined in the `tasks`
+module of each installed app and run by a worker started with:
+
+    celery -A todo worker
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo.settings')
+
+app = Celery('todo')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -29,12 +29,12 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-g=%a631xhsfe*6-q=%#q)jf&n_-6o)l)q=)z*n+@umfs5t5$sr'
+SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'django-insecure-g=%a631xhsfe*6-q=%#q)jf&n_-6o)l)q=)z*n+@umfs5t5$sr')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'True') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 LOGIN_URL = 'login'
 LOGOUT_URL = 'logout'
@@ -55,12 +55,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.middleware.SlowQueryMiddleware',
 ]
 
 ROOT_URLCONF = 'todo.urls'
@@ -103,12 +105,84 @@ DATABASES = {
 
         'PORT': POSTGREDB_PORT,
 
+        # Keep connections open between requests; each worker opens its
+        # connection during warm-up (see todo/warmup.py). Must be 0 under ASGI,
+        # which gunicorn.conf.py sets for uvicorn workers.
+        'CONN_MAX_AGE': int(os.getenv('POSTGREDB_CONN_MAX_AGE', 60)),
+
+        'CONN_HEALTH_CHECKS': True,
+
     }
 
 }
 
 
 
+# Slow-query log
+# Queries slower than the threshold are stored with their plan and can be
+# inspected in the admin. The log keeps only the most recent entries.
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 500))
+
+
+# Task archive
+# Completed tasks older than TASK_ARCHIVE_AFTER_DAYS are moved to the archive
+# table by `manage.py archive_tasks`, TASK_ARCHIVE_BATCH_SIZE rows at a time.
+
+TASK_ARCHIVE_AFTER_DAYS = int(os.getenv('TASK_ARCHIVE_AFTER_DAYS', 90))
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv('TASK_ARCHIVE_BATCH_SIZE', 1000))
+
+
+# Account deletion
+# `manage.py delete_account` and the admin action delete a user's data in
+# transactions of at most ACCOUNT_DELETION_CHUNK_SIZE rows.
+
+ACCOUNT_DELETION_CHUNK_SIZE = int(os.getenv('ACCOUNT_DELETION_CHUNK_SIZE', 5000))
+
+
+# Task attachments
+# Files are uploaded by the browser straight to an S3-compatible bucket using
+# presigned POST requests; thumbnails are generated by a Celery worker.
+
+ATTACHMENT_BUCKET = os.getenv('ATTACHMENT_BUCKET', '')
+ATTACHMENT_S3_ENDPOINT_URL = os.getenv('ATTACHMENT_S3_ENDPOINT_URL') or None
+ATTACHMENT_S3_REGION = os.getenv('ATTACHMENT_S3_REGION') or None
+ATTACHMENT_MAX_SIZE = int(os.getenv('ATTACHMENT_MAX_SIZE', 25 * 1024 * 1024))
+ATTACHMENT_URL_EXPIRES = int(os.getenv('ATTACHMENT_URL_EXPIRES', 300))
+ATTACHMENT_THUMBNAIL_SIZE = (256, 256)
+ATTACHMENT_PENDING_MAX_AGE_HOURS = int(os.getenv('ATTACHMENT_PENDING_MAX_AGE_HOURS', 24))
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
+
+
+# Reminders
+# `manage.py send_reminders` emails users REMINDER_LEAD_MINUTES before a task
+# is due, claiming at most REMINDER_BATCH_SIZE tasks per transaction. Failed
+# reminders are retried after REMINDER_RETRY_MINUTES, doubling the delay each
+# time, up to REMINDER_MAX_ATTEMPTS attempts.
+
+REMINDER_LEAD_MINUTES = int(os.getenv('REMINDER_LEAD_MINUTES', 60))
+REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 100))
+REMINDER_POLL_SECONDS = int(os.getenv('REMINDER_POLL_SECONDS', 60))
+REMINDER_RETRY_MINUTES = int(os.getenv('REMINDER_RETRY_MINUTES', 5))
+REMINDER_MAX_ATTEMPTS = int(os.getenv('REMINDER_MAX_ATTEMPTS', 5))
+
+
+# Cache
+# Per-user analytics are cached here. Set REDIS_CACHE_URL to share the cache
+# between worker processes and the `task_analytics` command.
+
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_CACHE_URL'),
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -145,6 +219,28 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles/')
+
+# Outside of DEBUG, collectstatic writes content-hashed copies of every file
+# plus gzip and brotli variants, and WhiteNoise serves the hashed files with
+# far-future immutable cache headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Bootstrap is included once, through the django_bootstrap5 template tags.
+BOOTSTRAP5 = {
+    'css_url': {'url': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css'},
+    'javascript_url': {'url': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js'},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
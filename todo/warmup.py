@@ -0,0 +1,62 @@
+"""
+Warm-up hooks for todo project.
+
+The gunicorn profile (gunicorn.conf.py) preloads the application in the master
+process and calls warm_up() there, so the URLconf, the views and every module
+they import, and the compiled templates are shared by all forked workers.
+Each worker then calls warm_up_worker() to open its own database connection
+before it accepts requests.
+"""
+
+import logging
+import os
+
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def compile_templates():
+    """
+    Load every template once so the cached template loader holds it compiled.
+    Return the number of compiled templates.
+    """
+    compiled = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if not name.endswith(('.html', '.txt')):
+                        continue
+                    template_name = os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+                    try:
+                        engine.get_template(template_name)
+                    except (TemplateDoesNotExist, TemplateSyntaxError):
+                        continue
+                    compiled += 1
+    return compiled
+
+
+def warm_up():
+    """
+    Import the URLconf and compile the templates. Safe to call before forking.
+    """
+    get_resolver().url_patterns
+    compiled = compile_templates()
+    logger.info('Warm-up compiled %s templates.', compiled)
+
+
+def warm_up_worker():
+    """
+    Open the database connections of a worker process. Must run after forking,
+    as connections cannot be shared between processes. Connections are per
+    thread, so with threaded workers each thread still connects on first use.
+    """
+    for connection in connections.all():
+        connection.close()
+        try:
+            connection.ensure_connection()
+        except DatabaseError as error:
+            logger.warning('Could not open database connection %s during warm-up: %s', connection.alias, error)